@@ -0,0 +1,87 @@
+"""
+Micro-benchmark for the per-page overhead of betterboto.utils.slurp.
+
+It compares the current implementation against the previous one (deepcopy of the kwargs on every call and eager
+f-string logging on every page) using a stubbed func, so only the pagination bookkeeping is measured.
+
+Run with::
+
+    python benchmarks/slurp_benchmark.py
+"""
+import copy
+import logging
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from betterboto.utils import slurp, logger  # noqa: E402
+
+PAGES = 50
+ITEMS_PER_PAGE = 20
+CALLS = 2000
+
+_pages = {}
+for _i in range(PAGES):
+    _page = {'Accounts': [{'Id': str(_i * ITEMS_PER_PAGE + j)} for j in range(ITEMS_PER_PAGE)]}
+    if _i < PAGES - 1:
+        _page['NextToken'] = 'token-{}'.format(_i + 1)
+    _pages['token-{}'.format(_i) if _i else None] = _page
+
+
+def stub_list_accounts(NextToken=None, **kwargs):
+    return dict(_pages[NextToken])
+
+
+def legacy_slurp(
+        name, func, response_to_concat,
+        next_token_name_in_response='NextPageToken', next_token_name_in_request='PageToken',
+        wait_between_pages=0,
+        **kwargs
+):
+    kwargs_to_use = copy.deepcopy(kwargs)
+    logging_prefix = ''
+    if kwargs_to_use.get('logging_prefix'):
+        logging_prefix = kwargs_to_use.get('logging_prefix')
+        del kwargs_to_use['logging_prefix']
+
+    logger.info("{}{}: {}".format(logging_prefix, name, kwargs_to_use))
+    all_responses = []
+    while True:
+        logger.info(f"{logging_prefix}{name} searching, {next_token_name_in_request}: {kwargs_to_use.get(next_token_name_in_request, 'FirstPage')}")
+        response = func(**kwargs_to_use)
+        all_responses += response.get(response_to_concat)
+        if response.get(next_token_name_in_response) is None:
+            response[response_to_concat] = all_responses
+            return response
+        else:
+            kwargs_to_use[next_token_name_in_request] = response.get(next_token_name_in_response)
+        time.sleep(wait_between_pages)
+
+
+def run(implementation):
+    return implementation(
+        'list_accounts', stub_list_accounts, 'Accounts', 'NextToken', 'NextToken',
+        Filters=[{'Key': 'Status', 'Values': ['ACTIVE', 'SUSPENDED']}],
+    )
+
+
+def per_page_microseconds(implementation):
+    seconds = min(timeit.repeat(lambda: run(implementation), number=CALLS, repeat=3))
+    return seconds / (CALLS * PAGES) * 1000000
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    assert len(run(legacy_slurp)['Accounts']) == len(run(slurp)['Accounts']) == PAGES * ITEMS_PER_PAGE
+    before = per_page_microseconds(legacy_slurp)
+    after = per_page_microseconds(slurp)
+    print("per page overhead before: {:.3f}us".format(before))
+    print("per page overhead after:  {:.3f}us".format(after))
+    print("speed up: {:.2f}x".format(before / after))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+import asyncio
+import functools
+import logging
+
+from botocore import xform_name
+
+from .client import client_pool
+from .utils import SlurpIterator
+
+
+logger = logging.getLogger(__file__)
+
+_exhausted = object()
+
+
+class AsyncClient(object):
+    """
+    AsyncClient lets you use a better client from asyncio code.  Any method of the client can be awaited, the *_iter
+    helpers become async generators and the waiters below sleep with asyncio.sleep, so thousands of waits can be in
+    flight in one event loop without needing a thread for each of them.
+
+    The wrapped client can either be a (better) boto3 client, whose calls are run on the given executor (or the event
+    loop's default executor when none is given), or an aiobotocore compatible client whose methods are coroutines and
+    are awaited directly.  The *_single_page and *_iter helpers are only available for boto3 clients.
+    """
+    def __init__(self, client, executor=None):
+        super().__init__()
+        self.client = client
+        self.executor = executor
+
+    async def _run(self, func, *args, **kwargs):
+        if asyncio.iscoroutinefunction(func):
+            return await func(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def call(self, method_name, **kwargs):
+        return await self._run(getattr(self.client, method_name), **kwargs)
+
+    async def _iterate(self, method_name, kwargs):
+        iterator = await self.call(method_name, **kwargs)
+        if isinstance(iterator, SlurpIterator):
+            # a whole page is fetched on each trip to the executor rather than each item
+            while True:
+                page = await self._run(iterator.next_page)
+                if page is None:
+                    return
+                for item in page:
+                    yield item
+        while True:
+            item = await self._run(next, iterator, _exhausted)
+            if item is _exhausted:
+                return
+            yield item
+
+    def __getattr__(self, name):
+        if name.endswith('_iter'):
+            return lambda **kwargs: self._iterate(name, kwargs)
+        return functools.partial(self.call, name)
+
+    async def slurp_iter(
+            self, name, response_to_concat,
+            next_token_name_in_response='NextPageToken', next_token_name_in_request='PageToken',
+            wait_between_pages=0,
+            **kwargs
+    ):
+        """
+        This is the async generator version of utils.slurp_iter.  It will await the operation with the given name until
+        there are no more pages left, yielding each item of response_to_concat as each page arrives.
+        """
+        logger.info("{}: {}".format(name, kwargs))
+        while True:
+            response = await self.call(name, **kwargs)
+            if response_to_concat not in response:
+                raise Exception("{} response does not contain {}".format(name, response_to_concat))
+            for item in response.get(response_to_concat):
+                yield item
+            next_token = response.get(next_token_name_in_response)
+            if next_token is None:
+                return
+            kwargs[next_token_name_in_request] = next_token
+            if wait_between_pages:
+                await asyncio.sleep(wait_between_pages)
+
+    async def wait(self, waiter_name, **kwargs):
+        """
+        This is the async version of client.get_waiter(waiter_name).wait(**kwargs).  It uses the delay, max attempts and
+        acceptors of the botocore waiter but sleeps between attempts with asyncio.sleep
+
+        :param waiter_name: the name of the waiter, eg stack_create_complete
+        :param kwargs: these are passed onto the operation the waiter polls
+        :return: the response that matched a success acceptor
+        """
+        config = self.client.get_waiter(waiter_name).config
+        operation_name = xform_name(config.operation)
+        for _ in range(config.max_attempts):
+            error = None
+            try:
+                response = await self.call(operation_name, **kwargs)
+            except self.client.exceptions.ClientError as e:
+                error = e
+                response = e.response
+            for acceptor in config.acceptors:
+                if acceptor.matcher_func(response):
+                    if acceptor.state == 'success':
+                        return response
+                    if acceptor.state == 'failure':
+                        raise Exception("Waiter {} failed: {}".format(waiter_name, response.get('Error', response)))
+                    break
+            else:
+                if error is not None:
+                    raise error
+            await asyncio.sleep(config.delay)
+        raise Exception("Waiter {} failed: Max attempts exceeded".format(waiter_name))
+
+    async def start_build_and_wait_for_completion(self, **kwargs):
+        """
+        This is the async version of codebuild.start_build_and_wait_for_completion
+        """
+        build = (await self.call('start_build', **kwargs)).get('build')
+        build_id = build.get('id')
+        while build.get('buildStatus') == 'IN_PROGRESS':
+            await asyncio.sleep(5)
+            response = await self.call('batch_get_builds', ids=[build_id])
+            build = response.get('builds')[0]
+            logger.info("Current status: {}".format(build.get('buildStatus')))
+        return build
+
+    async def put_parameter_and_wait(self, Name, MaxRetries=10, **kwargs):
+        """
+        This is the async version of ssm.put_parameter_and_wait
+        """
+        new_version = (await self.call('put_parameter', Name=Name, **kwargs)).get('Version')
+        parameters_by_path_cache = getattr(self.client, 'parameters_by_path_cache', None)
+        if parameters_by_path_cache is not None:
+            parameters_by_path_cache.invalidate(Name)
+        for _ in range(MaxRetries):
+            await asyncio.sleep(1)
+            try:
+                current_parameter = await self.call('get_parameter', Name=Name)
+            except self.client.exceptions.ParameterNotFound:
+                if new_version != 1:
+                    raise
+                continue
+            if current_parameter.get('Parameter').get('Version') >= new_version:
+                return current_parameter
+        raise Exception(f"Putting and waiting for param {Name} failed")
+
+
+class AsyncClientContextManager(object):
+    """
+    AsyncClientContextManager allows you to use a better boto3 client as an async python context manager.
+    This allows you to perform the following::
+
+        async with AsyncClientContextManager('organizations') as organizations:
+            async for account in organizations.list_accounts_iter():
+                print(account.get('Id'))
+
+        async with AsyncClientContextManager('cloudformation') as cloudformation:
+            await cloudformation.create_stack(**args)
+            await cloudformation.wait('stack_create_complete', StackName=args.get('StackName'))
+
+    The calls are run on executor, or the event loop's default executor when none is given.
+    """
+    def __init__(self, service_name, executor=None, **kwargs):
+        super().__init__()
+        self.service_name = service_name
+        self.executor = executor
+        self.kwargs = kwargs
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        client = await loop.run_in_executor(
+            self.executor, functools.partial(client_pool.get_client, self.service_name, **self.kwargs)
+        )
+        self.client = AsyncClient(client, executor=self.executor)
+        return self.client
+
+    async def __aexit__(self, *args, **kwargs):
+        self.client = None
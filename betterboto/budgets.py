@@ -1,7 +1,7 @@
 import types
 import logging
 
-from .utils import slurp
+from .utils import slurp, slurp_iter
 
 
 logger = logging.getLogger(__file__)
@@ -25,6 +25,25 @@ def describe_budgets_single_page(self, **kwargs):
     )
 
 
+def describe_budgets_iter(self, **kwargs):
+    """
+    This will continue to call describe_budgets until there are no more pages left to retrieve.  It will yield each of
+    the Budgets as each page is retrieved rather than waiting for every page.
+
+    :param self: budgets client
+    :param kwargs: these are passed onto the describe_budgets method call
+    :return: generator of budgets_client.describe_budgets.response.Budgets
+    """
+    return slurp_iter(
+        'describe_budgets',
+        self.describe_budgets,
+        'Budgets',
+        next_token_name_in_response='NextToken', next_token_name_in_request="NextToken",
+        **kwargs
+    )
+
+
 def make_better(client):
     client.describe_budgets_single_page = types.MethodType(describe_budgets_single_page, client)
+    client.describe_budgets_iter = types.MethodType(describe_budgets_iter, client)
     return client
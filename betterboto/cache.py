@@ -0,0 +1,181 @@
+import contextlib
+import datetime
+import functools
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+
+
+logger = logging.getLogger(__file__)
+
+DEFAULT_OPERATIONS = {
+    'organizations': [
+        'list_accounts_single_page',
+    ],
+    'servicecatalog': [
+        'list_portfolios_single_page',
+        'search_products_as_admin_single_page',
+    ],
+}
+
+
+def _encode(value):
+    if isinstance(value, datetime.datetime):
+        return {'__datetime__': value.isoformat()}
+    raise TypeError("Cannot cache value of type: {}".format(type(value)))
+
+
+def _decode(value):
+    if '__datetime__' in value and len(value) == 1:
+        return datetime.datetime.fromisoformat(value['__datetime__'])
+    return value
+
+
+class CachedClient(object):
+    """
+    CachedClient is returned from DiskCache.install.  The cached operations read through the cache and everything else
+    is passed straight on to the wrapped client, which is left unchanged.
+    """
+    def __init__(self, client):
+        super().__init__()
+        self.client = client
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+
+class DiskCache(object):
+    """
+    DiskCache is an opt in, persistent cache for listings that rarely change, such as the accounts in an organization
+    or the portfolios in a Service Catalog.  Responses are stored in a SQLite database under cache_dir keyed by account,
+    region, operation and the arguments used, so they are shared between process runs and between processes running at
+    the same time.
+    This allows you to perform the following::
+
+        cache = DiskCache(ttls={'list_accounts_single_page': 3600})
+        with ClientContextManager('organizations') as organizations:
+            organizations = cache.install(organizations, '0123456789010')
+            accounts = organizations.list_accounts_single_page().get('Accounts')
+
+    Entries older than the ttl for their operation are ignored.  Once the cache grows past max_size bytes the least
+    recently read entries are evicted.
+    """
+    def __init__(self, cache_dir=None, ttls=None, default_ttl=3600, max_size=64 * 1024 * 1024):
+        super().__init__()
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.expanduser('~'), '.cache', 'betterboto')
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, 'cache.sqlite')
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.max_size = max_size
+        with self._connect() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'key TEXT PRIMARY KEY, operation TEXT, value TEXT, size INTEGER, created_at REAL, read_at REAL'
+                ')'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS entries_read_at ON entries (read_at)')
+
+    @contextlib.contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def make_key(self, account_id, region_name, operation, kwargs):
+        normalized = json.dumps([account_id, region_name, operation, kwargs], sort_keys=True, default=str)
+        return hashlib.sha256(normalized.encode()).hexdigest()
+
+    def get(self, key, operation):
+        """
+        Returns the cached value for the key or None if there is no entry younger than the ttl for the operation
+        """
+        now = time.time()
+        ttl = self.ttls.get(operation, self.default_ttl)
+        with self._connect() as connection:
+            row = connection.execute(
+                'SELECT value FROM entries WHERE key = ? AND created_at > ?', (key, now - ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute('UPDATE entries SET read_at = ? WHERE key = ?', (now, key))
+        return json.loads(row[0], object_hook=_decode)
+
+    def put(self, key, operation, value):
+        now = time.time()
+        serialized = json.dumps(value, default=_encode)
+        with self._connect() as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                connection.execute(
+                    'INSERT OR REPLACE INTO entries (key, operation, value, size, created_at, read_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (key, operation, serialized, len(serialized), now, now)
+                )
+                self._evict(connection)
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+
+    def _evict(self, connection):
+        total_size = connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total_size <= self.max_size:
+            return
+        for key, size in connection.execute('SELECT key, size FROM entries ORDER BY read_at').fetchall():
+            connection.execute('DELETE FROM entries WHERE key = ?', (key,))
+            total_size -= size
+            if total_size <= self.max_size:
+                return
+
+    def invalidate(self, operation=None):
+        """
+        Removes the entries for the given operation, or every entry when no operation is given
+        """
+        with self._connect() as connection:
+            if operation is None:
+                connection.execute('DELETE FROM entries')
+            else:
+                connection.execute('DELETE FROM entries WHERE operation = ?', (operation,))
+
+    def install(self, client, account_id, operations=None):
+        """
+        Returns a CachedClient wrapping the given better client whose given methods read through this cache.  The
+        client itself is not changed, so other users of a pooled client are not affected.  When no operations are given
+        the defaults for the service are used.  The account_id is part of each key, so it must be the account whose
+        credentials the client uses, eg from sts.get_caller_identity.
+
+        :param client: a client returned from one of the betterboto context managers
+        :param account_id: the account the client is for
+        :param operations: list of method names to cache, eg ['list_accounts_single_page']
+        :return: CachedClient
+        """
+        service_name = client.meta.service_model.service_name
+        if operations is None:
+            operations = DEFAULT_OPERATIONS.get(service_name, [])
+        region_name = client.meta.region_name
+        cache = self
+        cached_client = CachedClient(client)
+
+        for operation in operations:
+            original = getattr(client, operation)
+
+            def cached(*args, _operation=operation, _original=original, **kwargs):
+                key = cache.make_key(account_id, region_name, _operation, kwargs)
+                value = cache.get(key, _operation)
+                if value is None:
+                    logger.info("{} was not cached, calling".format(_operation))
+                    value = _original(*args, **kwargs)
+                    cache.put(key, _operation, value)
+                return value
+
+            setattr(cached_client, operation, functools.wraps(original)(cached))
+
+        return cached_client
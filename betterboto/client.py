@@ -6,9 +6,15 @@ from . import codebuild
 from . import codecommit
 from . import ssm
 from . import budgets
+from . import logs
 from boto3.session import Session
+import botocore.session
 
+import collections
+import datetime
 import logging
+import threading
+from concurrent import futures
 
 logger = logging.getLogger(__file__)
 
@@ -30,9 +36,97 @@ def make_better(service_name, client):
         return ssm.make_better(client)
     elif service_name == 'budgets':
         return budgets.make_better(client)
+    elif service_name == 'logs':
+        return logs.make_better(client)
     return client
 
 
+class ClientPool(object):
+    """
+    ClientPool keeps the clients created by the context managers so they can be reused rather than created again each
+    time a context manager is entered.  Clients are keyed by service name and the arguments used to create them
+    (region, credentials, config, etc) and the least recently used client is dropped once there are more than max_size
+    of them.  The default max_size leaves room for a fan out over a few thousand account and region pairs.
+
+    boto3 sessions are not thread safe, so each thread creates its clients from its own Session.  The sessions share
+    one botocore loader, so each service model is still only loaded from disk once.  Different clients are created at
+    the same time, while threads asking for the same client wait for the first one to create it.
+
+    The context managers use the module level client_pool so callers do not need to change anything.  As clients are
+    shared, anything you set on a client will be seen by other users of the same service, region and credentials.
+    """
+    def __init__(self, max_size=4096):
+        super().__init__()
+        self.max_size = max_size
+        self._clients = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._local = threading.local()
+        self._loader = None
+
+    def _make_key(self, service_name, kwargs):
+        key = [service_name]
+        for name, value in sorted(kwargs.items()):
+            try:
+                hash(value)
+            except TypeError:
+                value = id(value)
+            if name == 'config':
+                value = id(value)
+            key.append((name, value))
+        return tuple(key)
+
+    def _get_session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            botocore_session = botocore.session.get_session()
+            with self._lock:
+                if self._loader is None:
+                    self._loader = botocore_session.get_component('data_loader')
+                loader = self._loader
+            botocore_session.register_component('data_loader', loader)
+            session = Session(botocore_session=botocore_session)
+            self._local.session = session
+        return session
+
+    def get_client(self, service_name, **kwargs):
+        """
+        Returns a better client for the given service name, creating it when there is not one in the pool already
+
+        :param service_name: the name of the service, eg cloudformation
+        :param kwargs: these are passed onto Session.client
+        :return: client
+        """
+        key = self._make_key(service_name, kwargs)
+        with self._lock:
+            if key in self._clients:
+                self._clients.move_to_end(key)
+                return self._clients[key][0]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                if key in self._clients:
+                    self._clients.move_to_end(key)
+                    return self._clients[key][0]
+            client = make_better(service_name, self._get_session().client(service_name, **kwargs))
+            with self._lock:
+                # the kwargs are kept alongside the client so the objects whose ids are used in the key stay alive
+                self._clients[key] = (client, kwargs)
+                self._key_locks.pop(key, None)
+                while len(self._clients) > self.max_size:
+                    self._clients.popitem(last=False)
+            return client
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+            self._loader = None
+            self._local = threading.local()
+
+
+client_pool = ClientPool()
+
+
 class ClientContextManager(object):
     """
     ClientContextManager allows you to use boto3 client as a python context manager.
@@ -47,17 +141,68 @@ class ClientContextManager(object):
         self.kwargs = kwargs
 
     def __enter__(self):
-        self.client = Session().client(
+        self.client = client_pool.get_client(
             self.service_name,
             **self.kwargs
         )
-        self.client = make_better(self.service_name, self.client)
         return self.client
 
     def __exit__(self, *args, **kwargs):
         self.client = None
 
 
+RegionResult = collections.namedtuple('RegionResult', ['region_name', 'result', 'exception'])
+
+
+class MultiRegionClients(dict):
+    """
+    MultiRegionClients is the dict of region name to client returned by MultiRegionClientContextManager.  As well as
+    being used as a dict it can run a callable in every region at the same time using a pool of threads::
+
+        with MultiRegionClientContextManager('cloudformation', ['us-east-1','eu-west-1']) as cloudformation_clients:
+            results = cloudformation_clients.map(
+                lambda region_name, cloudformation_client: cloudformation_client.create_or_update(**args)
+            )
+            for region_name, result in results.items():
+                if result.exception is not None:
+                    print(region_name, result.exception)
+
+    The callable is given the region name and the client for that region followed by any other args.  The result or
+    exception raised for each region is returned as a RegionResult.  When return_when is FIRST_EXCEPTION map returns as
+    soon as any region fails, cancelling the regions that have not started yet and only including the regions that
+    have finished.
+    """
+    def __init__(self, clients, max_workers=None):
+        super().__init__(clients)
+        self.max_workers = max_workers
+
+    def map(self, fn, *args, return_when=futures.ALL_COMPLETED, **kwargs):
+        executor = futures.ThreadPoolExecutor(max_workers=self.max_workers or max(len(self), 1))
+        try:
+            in_flight = {
+                executor.submit(fn, region_name, client, *args, **kwargs): region_name
+                for region_name, client in self.items()
+            }
+            done, not_done = futures.wait(in_flight, return_when=return_when)
+            for future in not_done:
+                future.cancel()
+        finally:
+            executor.shutdown(wait=return_when == futures.ALL_COMPLETED)
+
+        results = {}
+        for future in done:
+            region_name = in_flight[future]
+            exception = future.exception()
+            if exception is None:
+                results[region_name] = RegionResult(region_name, future.result(), None)
+            else:
+                logger.error("{} failed in {}: {}".format(getattr(fn, '__name__', fn), region_name, exception))
+                results[region_name] = RegionResult(region_name, None, exception)
+        return results
+
+    run_in_all_regions = map
+
+
 class MultiRegionClientContextManager(object):
     """
     MultiRegionClientContextManager allows you to use boto3 client as a python context manager for multiple regions.
@@ -67,32 +212,124 @@ class MultiRegionClientContextManager(object):
             for region_name, cloudformation_client in cloudformation_clients.items():
                 cloudformation_client.create_stack(**args)
 
-    If you want to deploy to multiple regions at the same time then you should use Python Threads
+    The clients for each region are created at the same time.  If you want to deploy to multiple regions at the same
+    time then you can use the map method of the returned MultiRegionClients, which uses up to max_workers threads.
     """
-    def __init__(self, service_name, regions, **kwargs):
+    def __init__(self, service_name, regions, max_workers=None, **kwargs):
         super().__init__()
         self.service_name = service_name
         self.regions = regions
+        self.max_workers = max_workers
         self.clients = {}
         self.kwargs = kwargs
 
+    def _make_client(self, region):
+        return client_pool.get_client(
+            self.service_name,
+            region_name=region,
+            **self.kwargs
+        )
+
     def __enter__(self):
-        for region in self.regions:
-            c = make_better(
-                self.service_name,
-                Session().client(
-                    self.service_name,
-                    region_name=region,
-                    **self.kwargs
-                )
-            )
-            self.clients[region] = c
+        with futures.ThreadPoolExecutor(max_workers=self.max_workers or max(len(self.regions), 1)) as executor:
+            clients = dict(zip(self.regions, executor.map(self._make_client, self.regions)))
+        self.clients = MultiRegionClients(clients, max_workers=self.max_workers)
         return self.clients
 
     def __exit__(self, *args, **kwargs):
         self.clients = None
 
 
+class CredentialCache(object):
+    """
+    CredentialCache keeps the credentials returned from sts.assume_role so they can be reused until shortly before
+    they expire, rather than assuming the role again each time a cross account context manager is entered.
+    Credentials are keyed by the chain of role arns and session names used to get them.  Each hop of a chain is cached
+    too, so chains sharing a prefix only assume the shared roles once.
+
+    Credentials with less than refresh_margin seconds left are refreshed before they are returned.  Credentials with
+    less than background_refresh_margin seconds left are returned straight away and refreshed on a background thread.
+
+    The cross account context managers use the module level credential_cache.
+    """
+    def __init__(self, refresh_margin=300, background_refresh_margin=900):
+        super().__init__()
+        self.refresh_margin = refresh_margin
+        self.background_refresh_margin = background_refresh_margin
+        self._credentials = {}
+        self._locks = collections.defaultdict(threading.Lock)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+    def _seconds_left(self, credentials):
+        return (credentials['Expiration'] - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+
+    def get_credentials(self, assumable_details):
+        """
+        Returns the credentials for the last role in the chain, assuming each role in turn when needed
+
+        :param assumable_details: list of (role_arn, role_session_name) to assume one after the other
+        :return: sts.assume_role.response.Credentials
+        """
+        key = tuple(tuple(assumable_detail) for assumable_detail in assumable_details)
+        credentials = self._credentials.get(key)
+        if credentials is None or self._seconds_left(credentials) <= self.refresh_margin:
+            with self._lock:
+                key_lock = self._locks[key]
+            with key_lock:
+                credentials = self._credentials.get(key)
+                if credentials is None or self._seconds_left(credentials) <= self.refresh_margin:
+                    credentials = self._assume(key)
+        elif self._seconds_left(credentials) <= self.background_refresh_margin:
+            with self._lock:
+                should_refresh = key not in self._refreshing
+                self._refreshing.add(key)
+            if should_refresh:
+                threading.Thread(target=self._refresh_in_background, args=(key,), daemon=True).start()
+        return credentials
+
+    def _refresh_in_background(self, key):
+        try:
+            with self._lock:
+                key_lock = self._locks[key]
+            with key_lock:
+                self._assume(key)
+        except Exception as e:
+            logger.warning('Could not refresh credentials for: {}: {}'.format(key[-1][0], e))
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _assume(self, key):
+        client_kwargs = {}
+        if len(key) > 1:
+            client_kwargs = credentials_to_client_kwargs(self.get_credentials(key[:-1]))
+        role_arn, role_session_name = key[-1]
+        logger.info('About to assume: {} with session name: {}'.format(role_arn, role_session_name))
+        sts = client_pool.get_client('sts', **client_kwargs)
+        credentials = sts.assume_role(
+            RoleArn=role_arn,
+            RoleSessionName=role_session_name,
+        )['Credentials']
+        self._credentials[key] = credentials
+        return credentials
+
+    def clear(self):
+        with self._lock:
+            self._credentials.clear()
+
+
+def credentials_to_client_kwargs(credentials):
+    return {
+        "aws_access_key_id": credentials['AccessKeyId'],
+        "aws_secret_access_key": credentials['SecretAccessKey'],
+        "aws_session_token": credentials['SessionToken'],
+    }
+
+
+credential_cache = CredentialCache()
+
+
 class CrossAccountClientContextManager(object):
     """
     CrossAccountClientContextManager allows you to use boto3 client as a python context manager for another account.
@@ -113,22 +350,12 @@ class CrossAccountClientContextManager(object):
         self.kwargs = kwargs
 
     def __enter__(self):
-        sts = Session().client('sts')
-        assumed_role_object = sts.assume_role(
-            RoleArn=self.role_arn,
-            RoleSessionName=self.role_session_name,
-        )
-        self.credentials = assumed_role_object['Credentials']
-        kwargs = {
-            "service_name": self.service_name,
-            "aws_access_key_id": self.credentials['AccessKeyId'],
-            "aws_secret_access_key": self.credentials['SecretAccessKey'],
-            "aws_session_token": self.credentials['SessionToken'],
-        }
+        self.credentials = credential_cache.get_credentials([(self.role_arn, self.role_session_name)])
+        kwargs = credentials_to_client_kwargs(self.credentials)
+        kwargs["service_name"] = self.service_name
         if self.kwargs is not None:
             kwargs.update(self.kwargs)
-        self.client = Session().client(**kwargs)
-        self.client = make_better(self.service_name, self.client)
+        self.client = client_pool.get_client(**kwargs)
         return self.client
 
     def __exit__(self, *args, **kwargs):
@@ -156,24 +383,8 @@ class CrossMultipleAccountsClientContextManager(object):
         self.kwargs = kwargs
 
     def __enter__(self):
-        credentials = {}
-        for assumable_detail in self.assumable_details:
-            role_arn, role_session_name = assumable_detail
-            logger.info('About to assume: {} with session name: {}'.format(role_arn, role_session_name))
-            sts = Session().client('sts', **credentials)
-            assumed_role_object = sts.assume_role(
-                RoleArn=role_arn,
-                RoleSessionName=role_session_name,
-            )
-            new_credentials = assumed_role_object['Credentials']
-            credentials = {
-                "aws_access_key_id": new_credentials['AccessKeyId'],
-                "aws_secret_access_key": new_credentials['SecretAccessKey'],
-                "aws_session_token": new_credentials['SessionToken'],
-            }
-
-        self.client = Session().client(self.service_name, **credentials)
-        self.client = make_better(self.service_name, self.client)
+        credentials = credentials_to_client_kwargs(credential_cache.get_credentials(self.assumable_details))
+        self.client = client_pool.get_client(self.service_name, **credentials)
         return self.client
 
     def __exit__(self, *args, **kwargs):
@@ -1,29 +1,252 @@
 import types
+import functools
 import logging
 import hashlib
+import json
 import botocore
 import time
+import threading
 import yaml
-import botocore
+import botocore.exceptions
+from concurrent import futures
 
-from .utils import slurp
+from .utils import slurp, slurp_iter, backoff_delays
 
 logger = logging.getLogger(__file__)
 
+FINGERPRINT_TAG_KEY = 'betterboto:fingerprint'
+
 
+@functools.lru_cache(maxsize=64)
 def get_hash_for_template(template):
     hasher = hashlib.md5()
     hasher.update(str.encode(template))
     return "{}{}".format('a', hasher.hexdigest())
 
 
-def create_or_update(self, ShouldUseChangeSets=True, ShouldDeleteRollbackComplete=False, **kwargs):
+@functools.lru_cache(maxsize=64)
+def _get_content_hash(template):
+    return hashlib.sha256(str.encode(template)).hexdigest()
+
+
+class TemplateStager(object):
+    """
+    TemplateStager uploads templates larger than threshold bytes to S3, under a key made from the hash of their
+    content, and passes a TemplateURL to CloudFormation instead of the TemplateBody.  A template is only uploaded when
+    its key is not already in the bucket, and each template is only hashed and checked once per process, so deploying
+    the same template to many accounts and regions uploads it once.
+    This allows you to perform the following::
+
+        with ClientContextManager('s3') as s3, ClientContextManager('cloudformation') as cloudformation:
+            stager = TemplateStager(s3, 'my-templates-bucket')
+            cloudformation.create_or_update(StackName='big', TemplateBody=big_template, TemplateStager=stager)
+
+    The roles used by CloudFormation need to be able to read the staged templates from the bucket.  The region of the
+    bucket, used in the TemplateURL, is looked up with get_bucket_location the first time it is needed unless
+    region_name is given.
+    """
+    def __init__(self, s3_client, bucket, prefix='templates/', threshold=51200, region_name=None):
+        super().__init__()
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.threshold = threshold
+        self.region_name = region_name
+        self._staged = set()
+        self._lock = threading.Lock()
+
+    def get_key(self, template):
+        return '{}{}.template'.format(self.prefix, _get_content_hash(template))
+
+    def get_region_name(self):
+        if self.region_name is None:
+            try:
+                location = self.s3_client.get_bucket_location(Bucket=self.bucket).get('LocationConstraint')
+            except self.s3_client.exceptions.ClientError as e:
+                raise Exception(
+                    "Could not find the region of bucket {}, pass region_name to TemplateStager: {}".format(
+                        self.bucket, e
+                    )
+                )
+            # buckets in us-east-1 have no location constraint and EU is the legacy name for eu-west-1
+            self.region_name = {None: 'us-east-1', '': 'us-east-1', 'EU': 'eu-west-1'}.get(location, location)
+        return self.region_name
+
+    def get_url(self, key):
+        return 'https://{}.s3.{}.amazonaws.com/{}'.format(self.bucket, self.get_region_name(), key)
+
+    def _ensure_uploaded(self, key, template):
+        try:
+            self.s3_client.head_object(Bucket=self.bucket, Key=key)
+            logger.info('Template already staged: {}'.format(key))
+        except self.s3_client.exceptions.ClientError as e:
+            if e.response.get('Error', {}).get('Code') not in ['404', 'NoSuchKey', 'NotFound']:
+                raise e
+            logger.info('Staging template: {}'.format(key))
+            self.s3_client.put_object(Bucket=self.bucket, Key=key, Body=str.encode(template))
+
+    def stage(self, kwargs):
+        """
+        Returns a copy of the given create_stack or create_change_set args with the TemplateBody swapped for a
+        TemplateURL when the template is larger than the threshold
+
+        :param kwargs: create_stack or create_change_set args
+        :return: the args to use
+        """
+        template = kwargs.get('TemplateBody')
+        if template is None or len(str.encode(template)) <= self.threshold:
+            return kwargs
+        key = self.get_key(template)
+        with self._lock:
+            self.get_region_name()
+            if key not in self._staged:
+                self._ensure_uploaded(key, template)
+                self._staged.add(key)
+        staged = dict(kwargs)
+        del staged['TemplateBody']
+        staged['TemplateURL'] = self.get_url(key)
+        return staged
+
+
+class StackOperationFailedException(botocore.exceptions.WaiterError):
+    """
+    StackOperationFailedException is raised when a stack operation does not succeed.  It is a WaiterError, which is
+    what was raised before stack operations were waited on by tailing stack events, so existing handlers still catch
+    it.  last_response is in the structure describe_stacks returns.
+    """
+    def __init__(self, reason, last_response=None):
+        super().__init__(name='StackOperation', reason=reason, last_response=last_response or {})
+
+
+def is_stack_event_for_stack(stack_event):
+    return stack_event.get('ResourceType') == 'AWS::CloudFormation::Stack' and \
+        stack_event.get('PhysicalResourceId') == stack_event.get('StackId')
+
+
+def get_last_stack_event_id(self, StackName):
+    """
+    This will return the id of the most recent event for the given stack so it can be given to
+    wait_for_stack_operation as the LastEventId
+
+    :param self: cloudformation client
+    :param StackName: the name or id of the stack
+    :return: the id of the most recent stack event or None if there are none
+    """
+    stack_events = self.describe_stack_events(StackName=StackName).get('StackEvents', [])
+    if len(stack_events) == 0:
+        return None
+    return stack_events[0].get('EventId')
+
+
+def wait_for_stack_operation(
+        self, StackName, SuccessStatuses, LastEventId=None, OnStackEvent=None, MinDelay=1, MaxDelay=15, MaxWait=3600,
+):
+    """
+    This will wait for the current operation on the given stack to finish by tailing its stack events rather than
+    polling describe_stacks.  Only the events newer than LastEventId are fetched on each poll.  Polling starts every
+    MinDelay seconds and backs off up to every MaxDelay seconds, and the wait ends as soon as the stack itself reaches a
+    status that is not IN_PROGRESS.  If that status is not one of the SuccessStatuses the failed events are logged and
+    a StackOperationFailedException is raised.
+
+    :param self: cloudformation client
+    :param StackName: the name or id of the stack.  Use the id when waiting for a stack to be deleted
+    :param SuccessStatuses: the list of stack statuses that mean the operation succeeded, eg ['CREATE_COMPLETE']
+    :param LastEventId: the id of the last event before the operation started, see get_last_stack_event_id
+    :param OnStackEvent: an optional callable that is given each new stack event, oldest first, as it is seen
+    :param MinDelay: the number of seconds to wait before the first poll
+    :param MaxDelay: the most number of seconds to wait between polls
+    :param MaxWait: the number of seconds after which to give up waiting
+    :return: the final status of the stack
+    """
+    delays = backoff_delays(MinDelay, MaxDelay)
+    failed_stack_events = []
+    started = time.time()
+    while True:
+        time.sleep(next(delays))
+        new_stack_events = []
+        kwargs = dict(StackName=StackName)
+        has_reached_last_event = False
+        # describe_stack_events returns the newest events first so only page back as far as the last event seen
+        while not has_reached_last_event:
+            response = self.describe_stack_events(**kwargs)
+            for stack_event in response.get('StackEvents', []):
+                if stack_event.get('EventId') == LastEventId:
+                    has_reached_last_event = True
+                    break
+                new_stack_events.append(stack_event)
+            if response.get('NextToken') is None:
+                break
+            kwargs['NextToken'] = response.get('NextToken')
+
+        for stack_event in reversed(new_stack_events):
+            LastEventId = stack_event.get('EventId')
+            status = stack_event.get('ResourceStatus')
+            if OnStackEvent is not None:
+                OnStackEvent(stack_event)
+            if status.endswith('_FAILED'):
+                failed_stack_events.append(stack_event)
+            if is_stack_event_for_stack(stack_event) and not status.endswith('_IN_PROGRESS'):
+                if status in SuccessStatuses:
+                    return status
+                for failed_stack_event in failed_stack_events:
+                    logger.error('{} {}: {}'.format(
+                        failed_stack_event.get('LogicalResourceId'),
+                        failed_stack_event.get('ResourceStatus'),
+                        failed_stack_event.get('ResourceStatusReason'),
+                    ))
+                raise StackOperationFailedException(
+                    "Stack {} finished with status {}".format(StackName, status),
+                    dict(Stacks=[dict(
+                        StackId=stack_event.get('StackId'),
+                        StackName=stack_event.get('StackName'),
+                        StackStatus=status,
+                        StackStatusReason=stack_event.get('ResourceStatusReason'),
+                    )]),
+                )
+
+        if time.time() - started > MaxWait:
+            raise StackOperationFailedException("Gave up waiting for stack {} after {} seconds".format(StackName, MaxWait))
+
+
+def get_fingerprint_for_stack(**kwargs):
+    """
+    This will return a hash of the arguments used to create or update a stack: the template, parameters, tags,
+    capabilities and anything else given.  The order of parameters, tags and capabilities does not change the hash.
+
+    :param kwargs: the arguments that would be passed onto create_stack or create_change_set
+    :return: the fingerprint
+    """
+    to_hash = {key: value for key, value in kwargs.items() if key != 'ClientRequestToken'}
+    if 'Parameters' in to_hash:
+        to_hash['Parameters'] = sorted(to_hash['Parameters'], key=lambda parameter: parameter.get('ParameterKey'))
+    if 'Tags' in to_hash:
+        to_hash['Tags'] = sorted(
+            [tag for tag in to_hash['Tags'] if tag.get('Key') != FINGERPRINT_TAG_KEY], key=lambda tag: tag.get('Key')
+        )
+    if 'Capabilities' in to_hash:
+        to_hash['Capabilities'] = sorted(to_hash['Capabilities'])
+    return get_hash_for_template(json.dumps(to_hash, sort_keys=True, default=str))
+
+
+def create_or_update(
+        self, ShouldUseChangeSets=True, ShouldDeleteRollbackComplete=False, OnStackEvent=None,
+        ShouldUseFingerprint=False, TemplateStager=None,
+        **kwargs
+):
     """
     For the given template and stack name, this method will create a stack if it doesnt already exist otherwise it will
     generate a changeset and then execute it.  This method will wait for the operation to complete before returning and
     in the instance of an error it will print out the stack events to help you debug more easily.
 
+    When ShouldUseFingerprint is True a fingerprint of the arguments (see get_fingerprint_for_stack) is stored in a
+    betterboto:fingerprint tag on the stack.  If the stack is CREATE_COMPLETE or UPDATE_COMPLETE and its tag matches the
+    fingerprint of this call nothing is done, saving the creation of a change set that would have no changes.  Changes
+    made to the stack outside of create_or_update will not be noticed while the fingerprint matches.
+
     :param self: cloudformation client
+    :param ShouldUseFingerprint: skip the update when the stack was last deployed with the same arguments
+    :param TemplateStager: an optional TemplateStager used to pass large templates via S3
+    :param OnStackEvent: an optional callable that is given each stack event as it happens, see wait_for_stack_operation
     :param kwargs: these are passed onto the create_stack and create_change_set method calls
     :return: None
     """
@@ -45,23 +268,29 @@ def create_or_update(self, ShouldUseChangeSets=True, ShouldDeleteRollbackComplet
             if stack.get("StackStatus") == "ROLLBACK_COMPLETE":
                 reason = stack.get('StackStatusReason', 'Unknown')
                 logger.info(f"Stack with id {stack_name} is ROLLBACK_COMPLETE because {reason}, deleting")
-                ensure_deleted(self, stack_name)
+                ensure_deleted(self, stack_name, OnStackEvent=OnStackEvent)
                 is_first_run = True
 
+    if ShouldUseFingerprint:
+        fingerprint = get_fingerprint_for_stack(**kwargs)
+        kwargs['Tags'] = [tag for tag in kwargs.get('Tags', []) if tag.get('Key') != FINGERPRINT_TAG_KEY] + [
+            dict(Key=FINGERPRINT_TAG_KEY, Value=fingerprint)
+        ]
+        if not is_first_run:
+            for stack in described_stacks.get('Stacks', []):
+                tags = {tag.get('Key'): tag.get('Value') for tag in stack.get('Tags', [])}
+                if stack.get('StackStatus') in ['CREATE_COMPLETE', 'UPDATE_COMPLETE'] and \
+                        tags.get(FINGERPRINT_TAG_KEY) == fingerprint:
+                    logger.info('Fingerprint unchanged, no changes to build for stack: {}'.format(stack_name))
+                    return
+
+    if TemplateStager is not None:
+        kwargs = TemplateStager.stage(kwargs)
+
     if is_first_run:
         logger.info('Creating: {}'.format(stack_name))
-        self.create_stack(**kwargs)
-        waiter = self.get_waiter('stack_create_complete')
-        try:
-            waiter.wait(StackName=stack_name)
-        except Exception as e:
-            response = self.describe_stack_events(StackName=stack_name)
-            for stack_event in response.get('StackEvents'):
-                logger.error('{}: {}'.format(
-                    stack_event.get('ResourceStatus'),
-                    stack_event.get('ResourceStatusReason'),
-                ))
-            raise e
+        stack_id = self.create_stack(**kwargs).get('StackId')
+        wait_for_stack_operation(self, stack_id, ['CREATE_COMPLETE'], OnStackEvent=OnStackEvent)
     else:
         if ShouldUseChangeSets:
             logger.info('Updating (with changeset): {}'.format(stack_name))
@@ -90,22 +319,15 @@ def create_or_update(self, ShouldUseChangeSets=True, ShouldDeleteRollbackComplet
             logger.info('Changes:' + yaml.safe_dump(change_set))
             if len(change_set) > 0:
                 logger.info('Executing change set: {}'.format(stack_name))
+                last_event_id = get_last_stack_event_id(self, stack_name)
                 self.execute_change_set(
                     ChangeSetName=change_set_name,
                     StackName=stack_name,
                 )
                 logger.info('Waiting for change set to execute: {}'.format(stack_name))
-                waiter = self.get_waiter('stack_update_complete')
-                try:
-                    waiter.wait(StackName=stack_name)
-                except Exception as e:
-                    response = self.describe_stack_events(StackName=stack_name)
-                    for stack_event in response.get('StackEvents'):
-                        logger.error('{}: {}'.format(
-                            stack_event.get('ResourceStatus'),
-                            stack_event.get('ResourceStatusReason'),
-                        ))
-                    raise e
+                wait_for_stack_operation(
+                    self, stack_name, ['UPDATE_COMPLETE'], LastEventId=last_event_id, OnStackEvent=OnStackEvent,
+                )
                 logger.info('Finished stack: {}'.format(stack_name))
             else:
                 self.delete_change_set(
@@ -118,19 +340,12 @@ def create_or_update(self, ShouldUseChangeSets=True, ShouldDeleteRollbackComplet
         else:
             logger.info('Updating (without changeset): {}'.format(stack_name))
             try:
+                last_event_id = get_last_stack_event_id(self, stack_name)
                 self.update_stack(**kwargs)
                 logger.info('Waiting for update_stack to complete: {}'.format(stack_name))
-                waiter = self.get_waiter('stack_update_complete')
-                try:
-                    waiter.wait(StackName=stack_name)
-                except Exception as e:
-                    response = self.describe_stack_events(StackName=stack_name)
-                    for stack_event in response.get('StackEvents'):
-                        logger.error('{}: {}'.format(
-                            stack_event.get('ResourceStatus'),
-                            stack_event.get('ResourceStatusReason'),
-                        ))
-                    raise e
+                wait_for_stack_operation(
+                    self, stack_name, ['UPDATE_COMPLETE'], LastEventId=last_event_id, OnStackEvent=OnStackEvent,
+                )
             except botocore.exceptions.ClientError as ex:
                 error_message = ex.response['Error']['Message']
                 if error_message == 'No updates are to be performed.':
@@ -141,6 +356,182 @@ def create_or_update(self, ShouldUseChangeSets=True, ShouldDeleteRollbackComplet
             logger.info('Finished stack: {}'.format(stack_name))
 
 
+class _CloudFormationLoader(yaml.SafeLoader):
+    pass
+
+
+def _construct_cloudformation_tag(loader, tag_suffix, node):
+    if isinstance(node, yaml.ScalarNode):
+        value = loader.construct_scalar(node)
+    elif isinstance(node, yaml.SequenceNode):
+        value = loader.construct_sequence(node, deep=True)
+    else:
+        value = loader.construct_mapping(node, deep=True)
+    if tag_suffix in ['Ref', 'Condition']:
+        return {tag_suffix: value}
+    return {'Fn::{}'.format(tag_suffix): value}
+
+
+_CloudFormationLoader.add_multi_constructor('!', _construct_cloudformation_tag)
+
+
+def load_template(template):
+    """
+    This will load a JSON or YAML template, including templates using the short form of the intrinsic functions such
+    as !Ref and !ImportValue
+
+    :param template: the template body
+    :return: the template as a dict
+    """
+    try:
+        return json.loads(template)
+    except ValueError:
+        return yaml.load(template, Loader=_CloudFormationLoader)
+
+
+def get_exports_and_imports_for_template(template):
+    """
+    This will return the names of the exports the template declares and the names it imports with Fn::ImportValue.
+    Names built using other intrinsic functions, such as Fn::Sub, cannot be known and are left out.
+
+    :param template: the template body
+    :return: tuple of (set of export names, set of import names)
+    """
+    loaded = load_template(template) or {}
+    exports = set()
+    for output in (loaded.get('Outputs') or {}).values():
+        name = (output.get('Export') or {}).get('Name')
+        if isinstance(name, str):
+            exports.add(name)
+
+    imports = set()
+    to_visit = [loaded]
+    while len(to_visit) > 0:
+        value = to_visit.pop()
+        if isinstance(value, dict):
+            if isinstance(value.get('Fn::ImportValue'), str):
+                imports.add(value.get('Fn::ImportValue'))
+            to_visit += value.values()
+        elif isinstance(value, list):
+            to_visit += value
+    return exports, imports
+
+
+def _run_in_dependency_order(names, dependencies, func, max_concurrency, on_failure):
+    for name, depends_on in dependencies.items():
+        unknown = set(depends_on) - set(names)
+        if len(unknown) > 0:
+            raise Exception('{} depends on unknown stacks: {}'.format(name, ', '.join(sorted(unknown))))
+
+    to_check = {name: set(dependencies.get(name, [])) for name in names}
+    while len(to_check) > 0:
+        ready = [name for name, depends_on in to_check.items() if len(depends_on) == 0]
+        if len(ready) == 0:
+            raise Exception('Circular dependency between stacks: {}'.format(', '.join(sorted(to_check.keys()))))
+        for name in ready:
+            del to_check[name]
+        for depends_on in to_check.values():
+            depends_on.difference_update(ready)
+
+    def timed(name):
+        started = time.time()
+        try:
+            func(name)
+            return dict(Status='SUCCEEDED', Duration=time.time() - started, Exception=None)
+        except Exception as e:
+            logger.error('{} failed: {}'.format(name, e))
+            return dict(Status='FAILED', Duration=time.time() - started, Exception=e)
+
+    results = {}
+    remaining = {name: set(dependencies.get(name, [])) for name in names}
+    should_stop = False
+    started = time.time()
+    with futures.ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        in_flight = {}
+        while len(remaining) > 0 or len(in_flight) > 0:
+            has_skipped = True
+            while has_skipped:
+                has_skipped = False
+                for name, depends_on in list(remaining.items()):
+                    if should_stop or any(results.get(d, {}).get('Status') in ['FAILED', 'SKIPPED'] for d in depends_on):
+                        logger.info('Skipping: {}'.format(name))
+                        results[name] = dict(Status='SKIPPED', Duration=0, Exception=None)
+                        del remaining[name]
+                        has_skipped = True
+
+            # only max_concurrency are submitted so none are left queued in the executor when stopping
+            for name, depends_on in list(remaining.items()):
+                if len(in_flight) >= max_concurrency:
+                    break
+                if all(results.get(d, {}).get('Status') == 'SUCCEEDED' for d in depends_on):
+                    in_flight[executor.submit(timed, name)] = name
+                    del remaining[name]
+
+            if len(in_flight) == 0:
+                continue
+            done, _ = futures.wait(in_flight, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                name = in_flight.pop(future)
+                results[name] = future.result()
+                if results[name].get('Status') == 'FAILED' and on_failure == 'STOP':
+                    should_stop = True
+
+    return dict(Stacks=results, Duration=time.time() - started)
+
+
+def deploy_stacks(self, Stacks, MaxConcurrency=5, OnFailure='SKIP_DEPENDENTS', ShouldInferDependencies=True):
+    """
+    This will create or update each of the given stacks, deploying stacks that do not depend on each other at the same
+    time.  Each stack is given as a dict of the args for create_or_update plus an optional DependsOn list of the names
+    of the other stacks that must be deployed first.  When ShouldInferDependencies is True a stack whose TemplateBody
+    imports a value exported by another of the stacks depends on that stack too.
+
+    When a stack fails the stacks that depend on it are skipped.  When OnFailure is STOP no further stacks are started
+    either, although the stacks already being deployed are waited for.
+
+    :param self: cloudformation client
+    :param Stacks: list of create_or_update args, eg [{'StackName': 'vpc', 'TemplateBody': '...', 'DependsOn': []}]
+    :param MaxConcurrency: the maximum number of stacks to deploy at once
+    :param OnFailure: SKIP_DEPENDENTS or STOP
+    :param ShouldInferDependencies: whether to add dependencies based on the exports and imports of the templates
+    :return: dict of Stacks (StackName to the Status, Duration and Exception of the deployment) and the total Duration
+    """
+    if OnFailure not in ['SKIP_DEPENDENTS', 'STOP']:
+        raise Exception('Unsupported OnFailure: {}'.format(OnFailure))
+
+    stacks = {}
+    dependencies = {}
+    for stack in Stacks:
+        stack = dict(stack)
+        stack_name = stack.get('StackName')
+        dependencies[stack_name] = set(stack.pop('DependsOn', []))
+        stacks[stack_name] = stack
+
+    if ShouldInferDependencies:
+        exporters = {}
+        importers = {}
+        for stack_name, stack in stacks.items():
+            if stack.get('TemplateBody') is not None:
+                exports, imports = get_exports_and_imports_for_template(stack.get('TemplateBody'))
+                for export in exports:
+                    exporters[export] = stack_name
+                importers[stack_name] = imports
+        for stack_name, imports in importers.items():
+            for import_name in imports:
+                exporter = exporters.get(import_name)
+                if exporter is not None and exporter != stack_name:
+                    dependencies[stack_name].add(exporter)
+
+    logger.info('Deploying {} stacks'.format(len(stacks)))
+    return _run_in_dependency_order(
+        list(stacks.keys()),
+        dependencies,
+        lambda stack_name: create_or_update(self, **stacks[stack_name]),
+        MaxConcurrency,
+        OnFailure,
+    )
+
+
 def describe_stacks_single_page(self, **kwargs):
     """
     This will continue to call describe_stacks until there are no more pages left to retrieve.  It will return
@@ -160,13 +551,33 @@ def describe_stacks_single_page(self, **kwargs):
     )
 
 
-def ensure_deleted(self, StackName):
+def describe_stacks_iter(self, **kwargs):
+    """
+    This will continue to call describe_stacks until there are no more pages left to retrieve.  It will yield each of
+    the Stacks as each page is retrieved rather than waiting for every page.
+
+    :param self: cloudformation client
+    :param kwargs: these are passed onto the describe_stacks method call
+    :return: generator of cloudformation_client.describe_stacks.response.Stacks
+    """
+    return slurp_iter(
+        'describe_stacks',
+        self.describe_stacks,
+        'Stacks',
+        next_token_name_in_response='NextToken',
+        next_token_name_in_request='NextToken',
+        **kwargs
+    )
+
+
+def ensure_deleted(self, StackName, OnStackEvent=None):
     """
     This will check if there is a stack with the given StackName in a state that can be deleted. If there is, it will
     delete it.
 
     :param self: cloudformation client
     :param StackName: This is the name of the stack that should be deleted
+    :param OnStackEvent: an optional callable that is given each stack event as it happens, see wait_for_stack_operation
     :return: None
     """
     logger.info('Ensuring: {} is deleted'.format(StackName))
@@ -188,18 +599,11 @@ def ensure_deleted(self, StackName):
             'UPDATE_ROLLBACK_FAILED','UPDATE_ROLLBACK_COMPLETE',
         ]:
             logger.info('Going to delete stack: {}'.format(stack.get('StackId')))
+            last_event_id = get_last_stack_event_id(self, stack.get('StackId'))
             self.delete_stack(StackName=StackName)
-            waiter = self.get_waiter('stack_delete_complete')
-            try:
-                waiter.wait(StackName=StackName)
-            except Exception as e:
-                response = self.describe_stack_events(StackName=StackName)
-                for stack_event in response.get('StackEvents'):
-                    logger.error('{}: {}'.format(
-                        stack_event.get('ResourceStatus'),
-                        stack_event.get('ResourceStatusReason'),
-                    ))
-                raise e
+            wait_for_stack_operation(
+                self, stack.get('StackId'), ['DELETE_COMPLETE'], LastEventId=last_event_id, OnStackEvent=OnStackEvent,
+            )
             logger.info('Finished ensure deleted: {}'.format(StackName))
 
 
@@ -208,23 +612,207 @@ def list_stacks_single_page(self, **kwargs):
     This will continue to call list_stacks until there are no more pages left to retrieve.  It will return
     the aggregated response in the same structure as list_stacks does.
 
-    :param self: servicecatalog client
+    :param self: cloudformation client
     :param kwargs: these are passed onto the list_stacks method call
-    :return: servicecatalog_client.list_stacks.response
+    :return: cloudformation_client.list_stacks.response
     """
     return slurp(
         'list_stacks',
         self.list_stacks,
-        'Stacks',
+        'StackSummaries',
+        next_token_name_in_response='NextToken',
+        next_token_name_in_request='NextToken',
+        **kwargs
+    )
+
+
+def list_stacks_iter(self, **kwargs):
+    """
+    This will continue to call list_stacks until there are no more pages left to retrieve.  It will yield each of
+    the StackSummaries as each page is retrieved rather than waiting for every page.
+
+    :param self: cloudformation client
+    :param kwargs: these are passed onto the list_stacks method call
+    :return: generator of cloudformation_client.list_stacks.response.StackSummaries
+    """
+    return slurp_iter(
+        'list_stacks',
+        self.list_stacks,
+        'StackSummaries',
+        next_token_name_in_response='NextToken',
+        next_token_name_in_request='NextToken',
+        **kwargs
+    )
+
+
+def list_exports_single_page(self, **kwargs):
+    """
+    This will continue to call list_exports until there are no more pages left to retrieve.  It will return
+    the aggregated response in the same structure as list_exports does.
+
+    :param self: cloudformation client
+    :param kwargs: these are passed onto the list_exports method call
+    :return: cloudformation_client.list_exports.response
+    """
+    return slurp(
+        'list_exports',
+        self.list_exports,
+        'Exports',
+        next_token_name_in_response='NextToken',
+        next_token_name_in_request='NextToken',
+        **kwargs
+    )
+
+
+def list_exports_iter(self, **kwargs):
+    """
+    This will continue to call list_exports until there are no more pages left to retrieve.  It will yield each of
+    the Exports as each page is retrieved rather than waiting for every page.
+
+    :param self: cloudformation client
+    :param kwargs: these are passed onto the list_exports method call
+    :return: generator of cloudformation_client.list_exports.response.Exports
+    """
+    return slurp_iter(
+        'list_exports',
+        self.list_exports,
+        'Exports',
+        next_token_name_in_response='NextToken',
+        next_token_name_in_request='NextToken',
+        **kwargs
+    )
+
+
+def list_imports_single_page(self, **kwargs):
+    """
+    This will continue to call list_imports until there are no more pages left to retrieve.  It will return
+    the aggregated response in the same structure as list_imports does.
+
+    :param self: cloudformation client
+    :param kwargs: these are passed onto the list_imports method call
+    :return: cloudformation_client.list_imports.response
+    """
+    return slurp(
+        'list_imports',
+        self.list_imports,
+        'Imports',
+        next_token_name_in_response='NextToken',
+        next_token_name_in_request='NextToken',
+        **kwargs
+    )
+
+
+def list_imports_iter(self, **kwargs):
+    """
+    This will continue to call list_imports until there are no more pages left to retrieve.  It will yield each of
+    the Imports as each page is retrieved rather than waiting for every page.
+
+    :param self: cloudformation client
+    :param kwargs: these are passed onto the list_imports method call
+    :return: generator of cloudformation_client.list_imports.response.Imports
+    """
+    return slurp_iter(
+        'list_imports',
+        self.list_imports,
+        'Imports',
         next_token_name_in_response='NextToken',
         next_token_name_in_request='NextToken',
         **kwargs
     )
 
 
+def get_stack_name_from_stack_id(stack_id):
+    # stack ids look like arn:aws:cloudformation:eu-west-1:0123456789010:stack/stack-name/uuid
+    return stack_id.split(':')[-1].split('/')[1]
+
+
+def ensure_deleted_many(
+        self, StackNames=None, StackNamePrefix=None, Tags=None, MaxConcurrency=5, OnFailure='SKIP_DEPENDENTS',
+        OnStackEvent=None, ShouldDeleteAll=False,
+):
+    """
+    This will ensure each of the given stacks is deleted, deleting stacks that do not depend on each other at the same
+    time.  The stacks are either the given StackNames or every stack whose name starts with StackNamePrefix and that
+    has all of the given Tags.  Nested stacks are never selected by StackNamePrefix or Tags as they are deleted along
+    with their root stack.  A stack that imports a value exported by another of the stacks is deleted before it.
+    When a stack cannot be deleted the stacks it imports from are skipped.  When OnFailure is STOP no further stacks
+    are started either.
+
+    At least one of StackNames, a non empty StackNamePrefix or non empty Tags must be given.  To delete every stack in
+    the account and region ShouldDeleteAll must be set to True instead.
+
+    :param self: cloudformation client
+    :param StackNames: list of the names of the stacks to delete
+    :param StackNamePrefix: delete the stacks whose names start with this prefix
+    :param Tags: dict of tag keys to values the stacks to delete must have
+    :param MaxConcurrency: the maximum number of stacks to delete at once
+    :param OnFailure: SKIP_DEPENDENTS or STOP
+    :param OnStackEvent: an optional callable that is given each stack event as it happens, see wait_for_stack_operation
+    :param ShouldDeleteAll: set to True to delete every stack when no StackNames, StackNamePrefix or Tags are given
+    :return: dict of Stacks (StackName to the Status, Duration and Exception of the deletion) and the total Duration
+    """
+    if OnFailure not in ['SKIP_DEPENDENTS', 'STOP']:
+        raise Exception('Unsupported OnFailure: {}'.format(OnFailure))
+    if StackNames is None and not StackNamePrefix and not Tags and not ShouldDeleteAll:
+        raise Exception(
+            'StackNames, StackNamePrefix or Tags must be given, or ShouldDeleteAll set to True to delete every stack'
+        )
+
+    if StackNames is not None:
+        stack_names = list(StackNames)
+    else:
+        stack_names = []
+        for stack in self.describe_stacks_iter():
+            if stack.get('ParentId') or stack.get('RootId'):
+                continue
+            if StackNamePrefix is not None and not stack.get('StackName').startswith(StackNamePrefix):
+                continue
+            stack_tags = {tag.get('Key'): tag.get('Value') for tag in stack.get('Tags', [])}
+            if any(stack_tags.get(key) != value for key, value in (Tags or {}).items()):
+                continue
+            stack_names.append(stack.get('StackName'))
+
+    # a stack exporting a value cannot be deleted until the stacks importing it have been
+    dependencies = {stack_name: set() for stack_name in stack_names}
+    for export in self.list_exports_iter():
+        exporter = get_stack_name_from_stack_id(export.get('ExportingStackId'))
+        if exporter not in dependencies:
+            continue
+        try:
+            importers = list(self.list_imports_iter(ExportName=export.get('Name')))
+        except self.exceptions.ClientError as e:
+            if 'is not imported by any stack' not in str(e):
+                raise e
+            importers = []
+        for importer in importers:
+            if importer in dependencies:
+                dependencies[exporter].add(importer)
+            else:
+                logger.warning('{} cannot be deleted while {} imports {}'.format(exporter, importer, export.get('Name')))
+
+    logger.info('Ensuring {} stacks are deleted'.format(len(stack_names)))
+    return _run_in_dependency_order(
+        stack_names,
+        dependencies,
+        lambda stack_name: ensure_deleted(self, stack_name, OnStackEvent=OnStackEvent),
+        MaxConcurrency,
+        OnFailure,
+    )
+
+
 def make_better(client):
     client.create_or_update = types.MethodType(create_or_update, client)
+    client.deploy_stacks = types.MethodType(deploy_stacks, client)
+    client.get_last_stack_event_id = types.MethodType(get_last_stack_event_id, client)
+    client.wait_for_stack_operation = types.MethodType(wait_for_stack_operation, client)
     client.describe_stacks_single_page = types.MethodType(describe_stacks_single_page, client)
+    client.describe_stacks_iter = types.MethodType(describe_stacks_iter, client)
     client.ensure_deleted = types.MethodType(ensure_deleted, client)
     client.list_stacks_single_page = types.MethodType(list_stacks_single_page, client)
+    client.list_stacks_iter = types.MethodType(list_stacks_iter, client)
+    client.list_exports_single_page = types.MethodType(list_exports_single_page, client)
+    client.list_exports_iter = types.MethodType(list_exports_iter, client)
+    client.list_imports_single_page = types.MethodType(list_imports_single_page, client)
+    client.list_imports_iter = types.MethodType(list_imports_iter, client)
+    client.ensure_deleted_many = types.MethodType(ensure_deleted_many, client)
     return client
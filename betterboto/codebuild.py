@@ -1,34 +1,129 @@
 import types
 import logging
 import time
+import collections
+
+from .utils import backoff_delays, call_with_retries
 
 
 logger = logging.getLogger(__file__)
 
+batch_get_builds_max_ids = 100
+
+BuildResult = collections.namedtuple('BuildResult', ['build_args', 'build', 'exception'])
 
-def start_build_and_wait_for_completion(self, **kwargs):
+
+def start_build_and_wait_for_completion(
+        self, OnLogLine=None, LogsClient=None, LogQuietPeriod=10, MaxLogDrainWait=60, **kwargs
+):
     """
     This will start a build of an AWS CodeBuild Project and wait for it to complete.
     It will return the result of the build.
 
+    When OnLogLine is given, the CloudWatch Logs log stream of the build is followed while waiting and each new log
+    line is given to OnLogLine as it arrives.  As log lines reach CloudWatch Logs a little after they are written, the
+    stream is still followed once the build completes, until no new lines arrive for LogQuietPeriod seconds or
+    MaxLogDrainWait seconds have passed.  The stream is read with LogsClient, a betterboto logs client, which must be
+    given along with OnLogLine so it uses the caller's own session and credentials.
+
     :param self: codebuild client
+    :param OnLogLine: an optional callable that is given each line the build logs
+    :param LogsClient: the betterboto logs client used to follow the log stream, required when OnLogLine is given
+    :param LogQuietPeriod: the number of seconds without new log lines after which the log is considered complete
+    :param MaxLogDrainWait: the most number of seconds to follow the log for once the build has completed
     :param kwargs: these are passed onto the start_build method call
     :return: codebuild_client.batch_get_builds.response[0]
     """
+    if OnLogLine is not None and LogsClient is None:
+        raise Exception('LogsClient must be given to follow the build log with OnLogLine')
     build = self.start_build(
         **kwargs
     ).get('build')
     build_id = build.get('id')
+    tailer = None
+
+    def follow_logs():
+        nonlocal tailer
+        build_logs = build.get('logs', {})
+        if tailer is None and build_logs.get('groupName') and build_logs.get('streamName'):
+            tailer = LogsClient.tail_log_stream(
+                logGroupName=build_logs.get('groupName'), logStreamName=build_logs.get('streamName'),
+            )
+        number_of_lines = 0
+        if tailer is not None:
+            for event in tailer.poll():
+                OnLogLine(event.get('message'))
+                number_of_lines += 1
+        return number_of_lines
 
     while build.get('buildStatus') == 'IN_PROGRESS':
+        time.sleep(5)
         response = self.batch_get_builds(ids=[build_id])
         build = response.get('builds')[0]
-        time.sleep(5)
         logger.info("Current status: {}".format(build.get('buildStatus')))
+        if OnLogLine is not None:
+            follow_logs()
+
+    if OnLogLine is not None:
+        started = time.time()
+        last_line_at = started
+        while time.time() - last_line_at < LogQuietPeriod and time.time() - started < MaxLogDrainWait:
+            time.sleep(2)
+            if follow_logs() > 0:
+                last_line_at = time.time()
 
     return build
 
 
+def start_builds_and_wait(self, Builds, MaxConcurrency=10, MinDelay=2, MaxDelay=30):
+    """
+    This will start each of the given builds, with at most MaxConcurrency running at once, and yield a BuildResult for
+    each one as soon as it completes.  All of the running builds are checked with one batch_get_builds call per poll
+    (for each 100 builds).  Polling starts every MinDelay seconds and backs off to every MaxDelay seconds, going back to
+    MinDelay whenever a build completes.
+
+    The build of each BuildResult is the completed build from batch_get_builds.  When a build could not be started,
+    for example because of an AccountLimitExceededException, the exception is given instead and the other builds carry
+    on.
+
+    :param self: codebuild client
+    :param Builds: list of the args to pass onto each start_build method call
+    :param MaxConcurrency: the maximum number of builds to have running at once
+    :param MinDelay: the number of seconds to wait between polls to begin with
+    :param MaxDelay: the most number of seconds to wait between polls
+    :return: generator of BuildResult
+    """
+    to_start = collections.deque(Builds)
+    in_progress = collections.OrderedDict()
+    delays = backoff_delays(MinDelay, MaxDelay)
+    while len(to_start) > 0 or len(in_progress) > 0:
+        while len(to_start) > 0 and len(in_progress) < MaxConcurrency:
+            build_args = to_start.popleft()
+            try:
+                build = call_with_retries(self.start_build, **build_args).get('build')
+            except Exception as e:
+                logger.error("Failed to start: {} with: {}".format(build_args.get('projectName'), e))
+                yield BuildResult(build_args, None, e)
+                continue
+            logger.info("Started: {}".format(build.get('id')))
+            in_progress[build.get('id')] = build_args
+
+        if len(in_progress) == 0:
+            continue
+        time.sleep(next(delays))
+        build_ids = list(in_progress.keys())
+        for i in range(0, len(build_ids), batch_get_builds_max_ids):
+            response = call_with_retries(self.batch_get_builds, ids=build_ids[i:i + batch_get_builds_max_ids])
+            for build in response.get('builds', []):
+                if build.get('buildStatus') != 'IN_PROGRESS':
+                    logger.info("Finished: {} with status: {}".format(build.get('id'), build.get('buildStatus')))
+                    build_args = in_progress.pop(build.get('id'))
+                    delays = backoff_delays(MinDelay, MaxDelay)
+                    yield BuildResult(build_args, build, None)
+        logger.info("Builds in progress: {}, waiting to start: {}".format(len(in_progress), len(to_start)))
+
+
 def make_better(client):
     client.start_build_and_wait_for_completion = types.MethodType(start_build_and_wait_for_completion, client)
+    client.start_builds_and_wait = types.MethodType(start_builds_and_wait, client)
     return client
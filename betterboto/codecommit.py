@@ -1,7 +1,7 @@
 import types
 import logging
 
-from .utils import slurp
+from .utils import slurp, slurp_iter
 
 
 logger = logging.getLogger(__file__)
@@ -26,6 +26,26 @@ def list_branches_single_page(self, **kwargs):
     )
 
 
+def list_branches_iter(self, **kwargs):
+    """
+    This will continue to call list_branches until there are no more pages left to retrieve.  It will yield each of
+    the branches as each page is retrieved rather than waiting for every page.
+
+    :param self: codecommit client
+    :param kwargs: these are passed onto the list_branches method call
+    :return: generator of codecommit_client.list_branches.response.branches
+    """
+    return slurp_iter(
+        'list_branches',
+        self.list_branches,
+        'branches',
+        'nextToken',
+        'nextToken',
+        **kwargs
+    )
+
+
 def make_better(client):
     client.list_branches_single_page = types.MethodType(list_branches_single_page, client)
+    client.list_branches_iter = types.MethodType(list_branches_iter, client)
     return client
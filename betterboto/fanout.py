@@ -0,0 +1,156 @@
+import collections
+import logging
+from concurrent import futures
+
+from .client import CrossAccountClientContextManager
+from .utils import call_with_retries
+
+
+logger = logging.getLogger(__file__)
+
+FanoutResult = collections.namedtuple('FanoutResult', ['account_id', 'region_name', 'result', 'exception'])
+
+
+class OrgFanout(object):
+    """
+    OrgFanout runs a callable in every selected account and region of an organization at the same time, assuming a
+    role in each account.
+    This allows you to perform the following::
+
+        with ClientContextManager('organizations') as organizations:
+            fanout = OrgFanout(
+                organizations,
+                'cloudformation',
+                'arn:aws:iam::{account_id}:role/deployer',
+                ['eu-west-1', 'us-east-1'],
+                ou_path='/workloads',
+            )
+            for result in fanout.run(lambda account_id, region_name, cloudformation: cloudformation.list_stacks_single_page()):
+                print(result.account_id, result.region_name, result.result, result.exception)
+
+    The accounts are those given in account_ids, the active accounts under ou_path or, when neither is given, every
+    active account in the organization.  The callable is given the account id, the region name and a better client for
+    the service in that account and region, followed by any other args given to run.  Results are yielded as a
+    FanoutResult as soon as each one finishes.
+
+    At most max_workers calls run at once, and at most max_concurrency_per_account of them are for the same account.
+    Assuming the role and creating the client are retried with exponential backoff up to max_retries times when they
+    are throttled.  The callable itself is only retried when should_retry_fn is True, as the whole callable is run
+    again, so it should only be set for callables that are safe to run more than once.
+    """
+    def __init__(
+            self, organizations_client, service_name, role_arn_template, regions,
+            ou_path=None, account_ids=None, snapshot=None,
+            role_session_name='betterboto-fanout', max_workers=20, max_concurrency_per_account=4, max_retries=5,
+            should_retry_fn=False,
+    ):
+        super().__init__()
+        self.organizations_client = organizations_client
+        self.service_name = service_name
+        self.role_arn_template = role_arn_template
+        self.regions = regions
+        self.ou_path = ou_path
+        self.account_ids = account_ids
+        self.snapshot = snapshot
+        self.role_session_name = role_session_name
+        self.max_workers = max_workers
+        self.max_concurrency_per_account = max_concurrency_per_account
+        self.max_retries = max_retries
+        self.should_retry_fn = should_retry_fn
+
+    def get_account_ids(self):
+        if self.account_ids is not None:
+            return list(self.account_ids)
+        if self.ou_path is not None:
+            parent_id = self.organizations_client.convert_path_to_ou(self.ou_path, Snapshot=self.snapshot)
+            if self.snapshot is not None:
+                children = self.snapshot.list_children_nested(parent_id, 'ACCOUNT')
+                return [
+                    child.get('Id') for child in children
+                    if self.snapshot.get_account(child.get('Id')).get('Status') == 'ACTIVE'
+                ]
+            organizational_unit_ids = self.organizations_client.list_children_nested(
+                ParentId=parent_id, ChildType='ORGANIZATIONAL_UNIT',
+            )
+            with futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                responses = executor.map(
+                    lambda organizational_unit_id: self.organizations_client.list_accounts_for_parent_single_page(
+                        ParentId=organizational_unit_id
+                    ),
+                    organizational_unit_ids,
+                )
+                return [
+                    account.get('Id')
+                    for response in responses
+                    for account in response.get('Accounts', [])
+                    if account.get('Status') == 'ACTIVE'
+                ]
+        return [
+            account.get('Id')
+            for account in self.organizations_client.list_accounts_iter()
+            if account.get('Status') == 'ACTIVE'
+        ]
+
+    def _run_one(self, account_id, region_name, fn, args, kwargs):
+        context_manager = CrossAccountClientContextManager(
+            self.service_name,
+            self.role_arn_template.format(account_id=account_id),
+            self.role_session_name,
+            region_name=region_name,
+        )
+        client = call_with_retries(context_manager.__enter__, max_retries=self.max_retries)
+        try:
+            if self.should_retry_fn:
+                return call_with_retries(
+                    fn, account_id, region_name, client, *args, max_retries=self.max_retries, **kwargs
+                )
+            return fn(account_id, region_name, client, *args, **kwargs)
+        finally:
+            context_manager.__exit__(None, None, None)
+
+    def run(self, fn, *args, **kwargs):
+        """
+        Runs fn in every selected account and region, yielding a FanoutResult for each as soon as it finishes
+        """
+        to_run = collections.OrderedDict()
+        if len(self.regions) > 0:
+            for account_id in self.get_account_ids():
+                to_run[account_id] = collections.deque(self.regions)
+        logger.info("Fanning out to {} accounts in {} regions".format(len(to_run), len(self.regions)))
+
+        in_flight = {}
+        in_flight_per_account = collections.Counter()
+        executor = futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while len(to_run) > 0 or len(in_flight) > 0:
+                # accounts take turns so one account with many regions does not hold up the others
+                has_submitted = True
+                while has_submitted and len(in_flight) < self.max_workers:
+                    has_submitted = False
+                    for account_id in list(to_run.keys()):
+                        if len(in_flight) >= self.max_workers:
+                            break
+                        if in_flight_per_account[account_id] >= self.max_concurrency_per_account:
+                            continue
+                        region_name = to_run[account_id].popleft()
+                        if len(to_run[account_id]) == 0:
+                            del to_run[account_id]
+                        future = executor.submit(self._run_one, account_id, region_name, fn, args, kwargs)
+                        in_flight[future] = (account_id, region_name)
+                        in_flight_per_account[account_id] += 1
+                        has_submitted = True
+
+                done, _ = futures.wait(in_flight, return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    account_id, region_name = in_flight.pop(future)
+                    in_flight_per_account[account_id] -= 1
+                    exception = future.exception()
+                    if exception is None:
+                        yield FanoutResult(account_id, region_name, future.result(), None)
+                    else:
+                        logger.error("Failed in {} {}: {}".format(account_id, region_name, exception))
+                        yield FanoutResult(account_id, region_name, None, exception)
+        finally:
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=False)
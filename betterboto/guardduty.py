@@ -1,7 +1,7 @@
 import types
 import logging
 
-from .utils import slurp
+from .utils import slurp, slurp_iter
 
 
 logger = logging.getLogger(__file__)
@@ -20,10 +20,30 @@ def list_members_single_page(self, **kwargs):
         'list_members',
         self.list_members,
         'Members',
+        'NextToken', 'NextToken',
+        **kwargs
+    )
+
+
+def list_members_iter(self, **kwargs):
+    """
+    This will continue to call list_members until there are no more pages left to retrieve.  It will yield each of
+    the Members as each page is retrieved rather than waiting for every page.
+
+    :param self: guardduty client
+    :param kwargs: these are passed onto the list_members method call
+    :return: generator of guardduty_client.list_members.response.Members
+    """
+    return slurp_iter(
+        'list_members',
+        self.list_members,
+        'Members',
+        'NextToken', 'NextToken',
         **kwargs
     )
 
 
 def make_better(client):
     client.list_members_single_page = types.MethodType(list_members_single_page, client)
+    client.list_members_iter = types.MethodType(list_members_iter, client)
     return client
@@ -0,0 +1,229 @@
+import csv
+import datetime
+import json
+import logging
+import queue
+import threading
+from concurrent import futures
+
+from .client import ClientContextManager, CrossAccountClientContextManager
+
+
+logger = logging.getLogger(__file__)
+
+ACTIVE_STACK_STATUSES = [
+    'CREATE_IN_PROGRESS', 'CREATE_FAILED', 'CREATE_COMPLETE',
+    'ROLLBACK_IN_PROGRESS', 'ROLLBACK_FAILED', 'ROLLBACK_COMPLETE',
+    'DELETE_IN_PROGRESS', 'DELETE_FAILED',
+    'UPDATE_IN_PROGRESS', 'UPDATE_COMPLETE_CLEANUP_IN_PROGRESS', 'UPDATE_COMPLETE', 'UPDATE_FAILED',
+    'UPDATE_ROLLBACK_IN_PROGRESS', 'UPDATE_ROLLBACK_FAILED', 'UPDATE_ROLLBACK_COMPLETE_CLEANUP_IN_PROGRESS',
+    'UPDATE_ROLLBACK_COMPLETE',
+    'REVIEW_IN_PROGRESS',
+    'IMPORT_IN_PROGRESS', 'IMPORT_COMPLETE',
+    'IMPORT_ROLLBACK_IN_PROGRESS', 'IMPORT_ROLLBACK_FAILED', 'IMPORT_ROLLBACK_COMPLETE',
+]
+
+
+class StackRecord(object):
+    """
+    StackRecord is a compact record of a stack holding only the fields needed for an inventory, and only the tags and
+    outputs that were asked for.
+    """
+    __slots__ = [
+        'account_id', 'region_name', 'stack_name', 'stack_id', 'stack_status', 'last_updated_time', 'tags', 'outputs',
+    ]
+
+    def __init__(
+            self, account_id, region_name, stack_name, stack_id, stack_status, last_updated_time, tags=None, outputs=None,
+    ):
+        self.account_id = account_id
+        self.region_name = region_name
+        self.stack_name = stack_name
+        self.stack_id = stack_id
+        self.stack_status = stack_status
+        self.last_updated_time = last_updated_time
+        self.tags = tags
+        self.outputs = outputs
+
+    @classmethod
+    def from_stack(cls, account_id, region_name, stack, tag_keys=None, output_keys=None):
+        tags = None
+        if tag_keys:
+            tags = {tag.get('Key'): tag.get('Value') for tag in stack.get('Tags', []) if tag.get('Key') in tag_keys}
+        outputs = None
+        if output_keys:
+            outputs = {
+                output.get('OutputKey'): output.get('OutputValue')
+                for output in stack.get('Outputs', []) if output.get('OutputKey') in output_keys
+            }
+        return cls(
+            account_id,
+            region_name,
+            stack.get('StackName'),
+            stack.get('StackId'),
+            stack.get('StackStatus'),
+            stack.get('LastUpdatedTime') or stack.get('CreationTime'),
+            tags,
+            outputs,
+        )
+
+    def to_dict(self):
+        result = {name: getattr(self, name) for name in self.__slots__}
+        if isinstance(self.last_updated_time, datetime.datetime):
+            result['last_updated_time'] = self.last_updated_time.isoformat()
+        return result
+
+
+_finished = object()
+
+
+def list_stack_inventory(
+        targets, role_arn_template=None, role_session_name='betterboto-inventory',
+        stack_status_filter=None, tag_keys=None, output_keys=None,
+        max_workers=10, max_queued_records=1000, on_error=None,
+):
+    """
+    This will list the stacks in each of the given account and region pairs at the same time, yielding a StackRecord
+    for each stack as soon as the page it is on arrives.  At most max_queued_records records are held in memory.
+
+    When no tags or outputs are asked for list_stacks is used so the stack_status_filter is applied by CloudFormation.
+    Otherwise describe_stacks is used, as list_stacks does not return tags or outputs, and the filter is applied here.
+    The filter defaults to every status other than DELETE_COMPLETE.
+
+    When role_arn_template is given, eg arn:aws:iam::{account_id}:role/reader, that role is assumed in each account.
+    Otherwise the current credentials are used for every target.  Failures for a target are given to on_error, along
+    with the account id and region name.  When there is no on_error the first failure is raised once every other
+    target has finished.
+
+    :param targets: list of (account_id, region_name)
+    :param role_arn_template: the arn of the role to assume, formatted with the account_id
+    :param role_session_name: the session name used when assuming the role
+    :param stack_status_filter: list of stack statuses to include
+    :param tag_keys: list of the keys of the tags to include in each record
+    :param output_keys: list of the keys of the outputs to include in each record
+    :param max_workers: the maximum number of account and region pairs to list at once
+    :param max_queued_records: the maximum number of records waiting to be yielded
+    :param on_error: an optional callable given the account_id, region_name and exception of each failed target
+    :return: generator of StackRecord
+    """
+    if stack_status_filter is None:
+        stack_status_filter = ACTIVE_STACK_STATUSES
+    records = queue.Queue(maxsize=max_queued_records)
+    has_stopped = threading.Event()
+    errors = []
+
+    def put(item):
+        while not has_stopped.is_set():
+            try:
+                records.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def list_target(account_id, region_name):
+        try:
+            if has_stopped.is_set():
+                return
+            if role_arn_template is None:
+                context_manager = ClientContextManager('cloudformation', region_name=region_name)
+            else:
+                context_manager = CrossAccountClientContextManager(
+                    'cloudformation',
+                    role_arn_template.format(account_id=account_id),
+                    role_session_name,
+                    region_name=region_name,
+                )
+            with context_manager as cloudformation:
+                if tag_keys or output_keys:
+                    stacks = (
+                        stack for stack in cloudformation.describe_stacks_iter()
+                        if stack.get('StackStatus') in stack_status_filter
+                    )
+                else:
+                    stacks = cloudformation.list_stacks_iter(StackStatusFilter=stack_status_filter)
+                for stack in stacks:
+                    record = StackRecord.from_stack(account_id, region_name, stack, tag_keys, output_keys)
+                    if not put(record):
+                        return
+        except Exception as e:
+            logger.error('Could not list stacks in {} {}: {}'.format(account_id, region_name, e))
+            if on_error is None:
+                errors.append(e)
+            else:
+                on_error(account_id, region_name, e)
+        finally:
+            put(_finished)
+
+    targets = list(targets)
+    executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+    submitted = []
+    try:
+        for account_id, region_name in targets:
+            submitted.append(executor.submit(list_target, account_id, region_name))
+        number_finished = 0
+        while number_finished < len(targets):
+            record = records.get()
+            if record is _finished:
+                number_finished += 1
+            else:
+                yield record
+    finally:
+        # the targets not yet started are cancelled so they do not assume a role or list stacks for nothing
+        has_stopped.set()
+        for future in submitted:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+    if len(errors) > 0:
+        raise errors[0]
+
+
+def _flatten(record, tag_keys, output_keys):
+    row = record.to_dict()
+    tags = row.pop('tags') or {}
+    outputs = row.pop('outputs') or {}
+    for tag_key in tag_keys or []:
+        row['tag:{}'.format(tag_key)] = tags.get(tag_key)
+    for output_key in output_keys or []:
+        row['output:{}'.format(output_key)] = outputs.get(output_key)
+    return row
+
+
+def write_json_lines(records, file):
+    """
+    This will write each record to the file as it arrives, one JSON object per line
+
+    :param records: iterable of StackRecord, eg from list_stack_inventory
+    :param file: a file opened for writing text
+    :return: the number of records written
+    """
+    count = 0
+    for record in records:
+        file.write(json.dumps(record.to_dict(), default=str))
+        file.write('\n')
+        count += 1
+    return count
+
+
+def write_csv(records, file, tag_keys=None, output_keys=None):
+    """
+    This will write each record to the file as it arrives as CSV, with a tag:<key> and output:<key> column for each of
+    the tag_keys and output_keys
+
+    :param records: iterable of StackRecord, eg from list_stack_inventory
+    :param file: a file opened for writing text with newline=''
+    :param tag_keys: the keys of the tags to write
+    :param output_keys: the keys of the outputs to write
+    :return: the number of records written
+    """
+    fieldnames = [name for name in StackRecord.__slots__ if name not in ['tags', 'outputs']]
+    fieldnames += ['tag:{}'.format(tag_key) for tag_key in tag_keys or []]
+    fieldnames += ['output:{}'.format(output_key) for output_key in output_keys or []]
+    writer = csv.DictWriter(file, fieldnames=fieldnames)
+    writer.writeheader()
+    count = 0
+    for record in records:
+        writer.writerow(_flatten(record, tag_keys, output_keys))
+        count += 1
+    return count
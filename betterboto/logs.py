@@ -0,0 +1,61 @@
+import types
+import logging
+
+
+logger = logging.getLogger(__file__)
+
+
+class LogStreamTailer(object):
+    """
+    LogStreamTailer follows a CloudWatch Logs log stream.  Each call to poll yields the events added to the stream
+    since the previous call, fetching them a page at a time using the forward token, so memory use does not grow with
+    the size of the stream.
+    This allows you to perform the following::
+
+        with ClientContextManager('logs') as logs:
+            tailer = logs.tail_log_stream(logGroupName='/aws/codebuild/project', logStreamName='stream')
+            while True:
+                for event in tailer.poll():
+                    print(event.get('message'))
+                time.sleep(5)
+    """
+    def __init__(self, client, log_group_name, log_stream_name):
+        super().__init__()
+        self.client = client
+        self.log_group_name = log_group_name
+        self.log_stream_name = log_stream_name
+        self.next_token = None
+
+    def poll(self):
+        while True:
+            kwargs = dict(logGroupName=self.log_group_name, logStreamName=self.log_stream_name, startFromHead=True)
+            if self.next_token is not None:
+                kwargs['nextToken'] = self.next_token
+            try:
+                response = self.client.get_log_events(**kwargs)
+            except self.client.exceptions.ResourceNotFoundException:
+                logger.info("Log stream {} does not exist yet".format(self.log_stream_name))
+                return
+            yield from response.get('events', [])
+            # when there are no more events the same forward token is returned again
+            if response.get('nextForwardToken') == self.next_token:
+                return
+            self.next_token = response.get('nextForwardToken')
+
+
+def tail_log_stream(self, logGroupName, logStreamName):
+    """
+    This will return a LogStreamTailer for the given log stream.  Each call to its poll method yields the events added
+    to the stream since the last call.
+
+    :param self: logs client
+    :param logGroupName: the name of the log group
+    :param logStreamName: the name of the log stream
+    :return: LogStreamTailer
+    """
+    return LogStreamTailer(self, logGroupName, logStreamName)
+
+
+def make_better(client):
+    client.tail_log_stream = types.MethodType(tail_log_stream, client)
+    return client
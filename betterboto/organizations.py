@@ -1,7 +1,10 @@
 import types
 import logging
+import threading
+import time
+from concurrent import futures
 
-from .utils import slurp
+from .utils import slurp, slurp_iter
 
 
 logger = logging.getLogger(__file__)
@@ -25,6 +28,24 @@ def list_targets_for_policy_single_page(self, **kwargs):
     )
 
 
+def list_targets_for_policy_iter(self, **kwargs):
+    """
+    This will continue to call list_targets_for_policy until there are no more pages left to retrieve.  It will yield each of
+    the Targets as each page is retrieved rather than waiting for every page.
+
+    :param self: organizations client
+    :param kwargs: these are passed onto the list_targets_for_policy method call
+    :return: generator of organizations_client.list_targets_for_policy.response.Targets
+    """
+    return slurp_iter(
+        'list_targets_for_policy',
+        self.list_targets_for_policy,
+        'Targets',
+        'NextToken', 'NextToken',
+        **kwargs
+    )
+
+
 def list_accounts_single_page(self, **kwargs):
     """
     This will continue to call list_accounts until there are no more pages left to retrieve.  It will return
@@ -43,6 +64,24 @@ def list_accounts_single_page(self, **kwargs):
     )
 
 
+def list_accounts_iter(self, **kwargs):
+    """
+    This will continue to call list_accounts until there are no more pages left to retrieve.  It will yield each of
+    the Accounts as each page is retrieved rather than waiting for every page.
+
+    :param self: organizations client
+    :param kwargs: these are passed onto the list_accounts method call
+    :return: generator of organizations_client.list_accounts.response.Accounts
+    """
+    return slurp_iter(
+        'list_accounts',
+        self.list_accounts,
+        'Accounts',
+        'NextToken', 'NextToken',
+        **kwargs
+    )
+
+
 def list_children_single_page(self, **kwargs):
     """
     This will continue to call list_children until there are no more pages left to retrieve.  It will return
@@ -61,6 +100,24 @@ def list_children_single_page(self, **kwargs):
     )
 
 
+def list_children_iter(self, **kwargs):
+    """
+    This will continue to call list_children until there are no more pages left to retrieve.  It will yield each of
+    the Children as each page is retrieved rather than waiting for every page.
+
+    :param self: organizations client
+    :param kwargs: these are passed onto the list_children method call
+    :return: generator of organizations_client.list_children.response.Children
+    """
+    return slurp_iter(
+        'list_children',
+        self.list_children,
+        'Children',
+        'NextToken', 'NextToken',
+        **kwargs
+    )
+
+
 def list_policies_single_page(self, **kwargs):
     """
     This will continue to call list_policies until there are no more pages left to retrieve.  It will return
@@ -79,6 +136,24 @@ def list_policies_single_page(self, **kwargs):
     )
 
 
+def list_policies_iter(self, **kwargs):
+    """
+    This will continue to call list_policies until there are no more pages left to retrieve.  It will yield each of
+    the Policies as each page is retrieved rather than waiting for every page.
+
+    :param self: organizations client
+    :param kwargs: these are passed onto the list_policies method call
+    :return: generator of organizations_client.list_policies.response.Policies
+    """
+    return slurp_iter(
+        'list_policies',
+        self.list_policies,
+        'Policies',
+        'NextToken', 'NextToken',
+        **kwargs
+    )
+
+
 def list_policies_for_target_single_page(self, **kwargs):
     """
     This will continue to call list_policies_for_target until there are no more pages left to retrieve.  It will return
@@ -97,6 +172,24 @@ def list_policies_for_target_single_page(self, **kwargs):
     )
 
 
+def list_policies_for_target_iter(self, **kwargs):
+    """
+    This will continue to call list_policies_for_target until there are no more pages left to retrieve.  It will yield each of
+    the Policies as each page is retrieved rather than waiting for every page.
+
+    :param self: organizations client
+    :param kwargs: these are passed onto the list_policies_for_target method call
+    :return: generator of organizations_client.list_policies_for_target.response.Policies
+    """
+    return slurp_iter(
+        'list_policies_for_target',
+        self.list_policies_for_target,
+        'Policies',
+        'NextToken', 'NextToken',
+        **kwargs
+    )
+
+
 def list_organizational_units_for_parent_single_page(self, **kwargs):
     """
     This will continue to call list_organizational_units_for_parent until there are no more pages left to retrieve.
@@ -115,6 +208,60 @@ def list_organizational_units_for_parent_single_page(self, **kwargs):
     )
 
 
+def list_organizational_units_for_parent_iter(self, **kwargs):
+    """
+    This will continue to call list_organizational_units_for_parent until there are no more pages left to retrieve.  It will yield each of
+    the OrganizationalUnits as each page is retrieved rather than waiting for every page.
+
+    :param self: organizations client
+    :param kwargs: these are passed onto the list_organizational_units_for_parent method call
+    :return: generator of organizations_client.list_organizational_units_for_parent.response.OrganizationalUnits
+    """
+    return slurp_iter(
+        'list_organizational_units_for_parent',
+        self.list_organizational_units_for_parent,
+        'OrganizationalUnits',
+        'NextToken', 'NextToken',
+        **kwargs
+    )
+
+
+def list_accounts_for_parent_single_page(self, **kwargs):
+    """
+    This will continue to call list_accounts_for_parent until there are no more pages left to retrieve.
+    It will return the aggregated response in the same structure as list_accounts_for_parent does.
+
+    :param self: organizations client
+    :param kwargs: these are passed onto the list_accounts_for_parent method call
+    :return: organizations_client.list_accounts_for_parent.response
+    """
+    return slurp(
+        'list_accounts_for_parent',
+        self.list_accounts_for_parent,
+        'Accounts',
+        'NextToken', 'NextToken',
+        **kwargs
+    )
+
+
+def list_accounts_for_parent_iter(self, **kwargs):
+    """
+    This will continue to call list_accounts_for_parent until there are no more pages left to retrieve.  It will yield each of
+    the Accounts as each page is retrieved rather than waiting for every page.
+
+    :param self: organizations client
+    :param kwargs: these are passed onto the list_accounts_for_parent method call
+    :return: generator of organizations_client.list_accounts_for_parent.response.Accounts
+    """
+    return slurp_iter(
+        'list_accounts_for_parent',
+        self.list_accounts_for_parent,
+        'Accounts',
+        'NextToken', 'NextToken',
+        **kwargs
+    )
+
+
 def list_roots_single_page(self, **kwargs):
     """
     This will continue to call list_roots until there are no more pages left to retrieve.
@@ -133,6 +280,24 @@ def list_roots_single_page(self, **kwargs):
     )
 
 
+def list_roots_iter(self, **kwargs):
+    """
+    This will continue to call list_roots until there are no more pages left to retrieve.  It will yield each of
+    the Roots as each page is retrieved rather than waiting for every page.
+
+    :param self: organizations client
+    :param kwargs: these are passed onto the list_roots method call
+    :return: generator of organizations_client.list_roots.response.Roots
+    """
+    return slurp_iter(
+        'list_roots',
+        self.list_roots,
+        'Roots',
+        'NextToken', 'NextToken',
+        **kwargs
+    )
+
+
 def list_parents_single_page(self, **kwargs):
     """
     This will continue to call list_parents until there are no more pages left to retrieve.
@@ -151,6 +316,24 @@ def list_parents_single_page(self, **kwargs):
     )
 
 
+def list_parents_iter(self, **kwargs):
+    """
+    This will continue to call list_parents until there are no more pages left to retrieve.  It will yield each of
+    the Parents as each page is retrieved rather than waiting for every page.
+
+    :param self: organizations client
+    :param kwargs: these are passed onto the list_parents method call
+    :return: generator of organizations_client.list_parents.response.Parents
+    """
+    return slurp_iter(
+        'list_parents',
+        self.list_parents,
+        'Parents',
+        'NextToken', 'NextToken',
+        **kwargs
+    )
+
+
 def list_delegated_administrators_single_page(self, **kwargs):
     """
     This will continue to call list_delegated_administrators until there are no more pages left to retrieve.
@@ -169,6 +352,24 @@ def list_delegated_administrators_single_page(self, **kwargs):
     )
 
 
+def list_delegated_administrators_iter(self, **kwargs):
+    """
+    This will continue to call list_delegated_administrators until there are no more pages left to retrieve.  It will yield each of
+    the DelegatedAdministrators as each page is retrieved rather than waiting for every page.
+
+    :param self: organizations client
+    :param kwargs: these are passed onto the list_delegated_administrators method call
+    :return: generator of organizations_client.list_delegated_administrators.response.DelegatedAdministrators
+    """
+    return slurp_iter(
+        'list_delegated_administrators',
+        self.list_delegated_administrators,
+        'DelegatedAdministrators',
+        'NextToken', 'NextToken',
+        **kwargs
+    )
+
+
 def list_delegated_services_for_account_single_page(self, **kwargs):
     """
     This will continue to call list_delegated_services_for_account until there are no more pages left to retrieve.
@@ -187,41 +388,89 @@ def list_delegated_services_for_account_single_page(self, **kwargs):
     )
 
 
-def list_children_nested(self, **kwargs):
+def list_delegated_services_for_account_iter(self, **kwargs):
+    """
+    This will continue to call list_delegated_services_for_account until there are no more pages left to retrieve.  It will yield each of
+    the DelegatedServices as each page is retrieved rather than waiting for every page.
+
+    :param self: organizations client
+    :param kwargs: these are passed onto the list_delegated_services_for_account method call
+    :return: generator of organizations_client.list_delegated_services_for_account.response.DelegatedServices
+    """
+    return slurp_iter(
+        'list_delegated_services_for_account',
+        self.list_delegated_services_for_account,
+        'DelegatedServices',
+        'NextToken', 'NextToken',
+        **kwargs
+    )
+
+
+def list_children_nested(self, MaxConcurrency=10, Snapshot=None, **kwargs):
     """
     This method will return a list of all children (either ACCOUNT or ORGANIZATIONAL_UNIT) for the given ParentId.  It
     includes children, grandchildren lower levels of nesting.
 
+    The organizational units are walked breadth first using a pool of threads: as soon as the children of an
+    organizational unit are known their own children are requested, so the time taken grows with the depth of the tree
+    rather than the number of organizational units in it.  The results are returned in the same order as a depth first
+    walk would have returned them.
+
     :param self: organizations client
+    :param MaxConcurrency: the maximum number of list_children calls that will be in flight at any one time
+    :param Snapshot: an optional OrganizationSnapshot to read the children from instead of calling list_children
     :param kwargs: these are passed onto the list_children method call
     :return: list of children in the structure of [{'Id': "0123456789010"}, {'Id': "1009876543210"}]
     """
     child_type = kwargs.get('ChildType')
     parent_id = kwargs.get('ParentId')
 
-    if child_type == 'ACCOUNT':
-        response = self.list_children_single_page(ParentId=parent_id, ChildType='ACCOUNT')
-        my_account_children = response.get('Children')
+    if child_type not in ['ACCOUNT', 'ORGANIZATIONAL_UNIT']:
+        raise Exception('Unsupported ChildType: {}'.format(child_type))
 
-        response = self.list_children_single_page(ParentId=parent_id, ChildType='ORGANIZATIONAL_UNIT')
-        my_org_children = response.get('Children')
-        for my_org_child in my_org_children:
-            my_account_children += self.list_children_nested(ParentId=my_org_child.get('Id'), ChildType='ACCOUNT')
+    if Snapshot is not None:
+        return Snapshot.list_children_nested(parent_id, child_type)
 
-        return my_account_children
+    organizational_unit_children = {}
+    account_children_futures = {}
+    with futures.ThreadPoolExecutor(max_workers=MaxConcurrency) as executor:
+        in_flight = {}
 
-    elif child_type == 'ORGANIZATIONAL_UNIT':
-        my_account_children = [kwargs.get('ParentId')]
+        def visit(organizational_unit_id):
+            if child_type == 'ACCOUNT':
+                account_children_futures[organizational_unit_id] = executor.submit(
+                    self.list_children_single_page, ParentId=organizational_unit_id, ChildType='ACCOUNT'
+                )
+            future = executor.submit(
+                self.list_children_single_page, ParentId=organizational_unit_id, ChildType='ORGANIZATIONAL_UNIT'
+            )
+            in_flight[future] = organizational_unit_id
 
-        response = self.list_children_single_page(ParentId=parent_id, ChildType='ORGANIZATIONAL_UNIT')
-        my_org_children = response.get('Children')
-        for my_org_child in my_org_children:
-            my_account_children += self.list_children_nested(ParentId=my_org_child.get('Id'), ChildType='ORGANIZATIONAL_UNIT')
+        visit(parent_id)
+        while len(in_flight) > 0:
+            done, _ = futures.wait(in_flight, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                organizational_unit_id = in_flight.pop(future)
+                children = future.result().get('Children')
+                organizational_unit_children[organizational_unit_id] = children
+                for child in children:
+                    visit(child.get('Id'))
 
-        return my_account_children
+        account_children = {
+            organizational_unit_id: future.result().get('Children')
+            for organizational_unit_id, future in account_children_futures.items()
+        }
 
-    else:
-        raise Exception('Unsupported ChildType: {}'.format(child_type))
+    result = []
+    to_flatten = [parent_id]
+    while len(to_flatten) > 0:
+        organizational_unit_id = to_flatten.pop()
+        if child_type == 'ACCOUNT':
+            result += account_children[organizational_unit_id]
+        else:
+            result.append(organizational_unit_id)
+        to_flatten += reversed([child.get('Id') for child in organizational_unit_children[organizational_unit_id]])
+    return result
 
 
 def build_ou_tree_branch(self, parent_id):
@@ -247,17 +496,21 @@ def find_match(self, parts, parent_id):
                 return self.find_match(parts, organizational_unit.get('Id'))
 
 
-def convert_path_to_ou(self, path):
+def convert_path_to_ou(self, path, Snapshot=None):
     """
     This method accepts a path and returns the ou.
     This raises an exception when converting / and you have more than one root
 
     :param self: organizations client
     :param path: organizations path
+    :param Snapshot: an optional OrganizationSnapshot to look the path up in instead of walking the organization
     :return: the ou of the path specified
     """
     logger.info("Converting: {}".format(path))
 
+    if Snapshot is not None:
+        return Snapshot.convert_path_to_ou(path)
+
     if path == "/":
         response = self.list_roots()
         assert len(response.get('Roots')) == 1, "You have {} roots".format(len(response.get('Roots')))
@@ -283,19 +536,506 @@ def convert_path_to_ou(self, path):
     raise Exception("not found")
 
 
+class OrganizationalUnitNode(object):
+    """
+    OrganizationalUnitNode is a compact record of a root or ou in an OrganizationTree.  Children and accounts are held
+    as lists of ids, and accounts is None when the tree was built without them.
+    """
+    __slots__ = ['id', 'name', 'arn', 'path', 'parent_id', 'children', 'accounts']
+
+    def __init__(self, id, name, arn, path, parent_id=None, children=None, accounts=None):
+        self.id = id
+        self.name = name
+        self.arn = arn
+        self.path = path
+        self.parent_id = parent_id
+        self.children = children if children is not None else []
+        self.accounts = accounts
+
+    def to_organizational_unit(self):
+        return dict(Id=self.id, Arn=self.arn, Name=self.name)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+class OrganizationTree(object):
+    """
+    OrganizationTree holds the roots and ous of an organization, or of one branch of it, as OrganizationalUnitNodes
+    indexed by id and by path.  Use build_ou_tree on the organizations client to create one::
+
+        with ClientContextManager('organizations') as organizations:
+            tree = organizations.build_ou_tree(ShouldIncludeAccounts=True)
+            node = tree.get_node_by_path('/workloads/prod')
+            print([tree.get_node(child_id).name for child_id in node.children], node.accounts)
+            with open('tree.json', 'w') as f:
+                json.dump(tree.to_dict(), f)
+
+    The top of the tree has the path / and each ou below it has the path of its parent followed by its name.  When two
+    ous under the same parent have the same name both are kept, and the path index points at the first of them in the
+    order list_organizational_units_for_parent returned them.
+    """
+    def __init__(self, roots, nodes, accounts=None):
+        super().__init__()
+        self.roots = roots
+        self.nodes = nodes
+        self.accounts = accounts
+        self.paths = {}
+        for node in self.walk():
+            self.paths.setdefault(node.path, node.id)
+
+    @classmethod
+    def build(cls, client, parent_id=None, include_accounts=False, max_concurrency=10):
+        """
+        Builds the tree below parent_id, or below every root when no parent_id is given, listing the ous (and
+        accounts) of each level concurrently.  list_organizational_units_for_parent returns the name of each ou so
+        only one call is needed for each ou, or two when accounts are included.
+        """
+        if parent_id is None or parent_id.startswith('r-'):
+            tops = [
+                root for root in client.list_roots_single_page().get('Roots', [])
+                if parent_id is None or root.get('Id') == parent_id
+            ]
+        else:
+            tops = [client.describe_organizational_unit(OrganizationalUnitId=parent_id).get('OrganizationalUnit')]
+        roots = [top.get('Id') for top in tops]
+        nodes = {}
+        accounts = {} if include_accounts else None
+
+        with futures.ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            in_flight = {}
+
+            def visit(node):
+                nodes[node.id] = node
+                organizational_units = executor.submit(
+                    client.list_organizational_units_for_parent_single_page, ParentId=node.id
+                )
+                in_flight[organizational_units] = ('ORGANIZATIONAL_UNIT', node)
+                if include_accounts:
+                    node.accounts = []
+                    in_flight[executor.submit(client.list_accounts_for_parent_single_page, ParentId=node.id)] = (
+                        'ACCOUNT', node
+                    )
+
+            for top in tops:
+                visit(OrganizationalUnitNode(top.get('Id'), top.get('Name'), top.get('Arn'), '/'))
+
+            while len(in_flight) > 0:
+                done, _ = futures.wait(in_flight, return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    child_type, node = in_flight.pop(future)
+                    if child_type == 'ACCOUNT':
+                        for account in future.result().get('Accounts', []):
+                            node.accounts.append(account.get('Id'))
+                            accounts[account.get('Id')] = account
+                    else:
+                        for organizational_unit in future.result().get('OrganizationalUnits', []):
+                            node.children.append(organizational_unit.get('Id'))
+                            visit(OrganizationalUnitNode(
+                                organizational_unit.get('Id'),
+                                organizational_unit.get('Name'),
+                                organizational_unit.get('Arn'),
+                                "{}/{}".format(node.path.rstrip('/'), organizational_unit.get('Name')),
+                                node.id,
+                            ))
+
+        logger.info("Built organization tree of {} organizational units".format(len(nodes) - len(roots)))
+        return cls(roots, nodes, accounts)
+
+    def get_node(self, node_id):
+        return self.nodes.get(node_id)
+
+    def get_node_by_path(self, path):
+        node_id = self.paths.get(path)
+        return None if node_id is None else self.nodes.get(node_id)
+
+    def walk(self):
+        """
+        Yields each node of the tree, depth first, with the children of each node in the order they were listed
+        """
+        to_visit = list(reversed(self.roots))
+        while len(to_visit) > 0:
+            node = self.nodes[to_visit.pop()]
+            yield node
+            to_visit += reversed(node.children)
+
+    def to_dict(self):
+        return dict(
+            Roots=self.roots,
+            Nodes=[node.to_dict() for node in self.walk()],
+            Accounts=self.accounts,
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        nodes = {}
+        for node in data.get('Nodes', []):
+            node = OrganizationalUnitNode.from_dict(node)
+            nodes[node.id] = node
+        return cls(data.get('Roots', []), nodes, data.get('Accounts'))
+
+
+def build_ou_tree(self, ParentId=None, ShouldIncludeAccounts=False, MaxConcurrency=10):
+    """
+    This method will build an OrganizationTree of the ous below ParentId, or of the whole organization when no ParentId
+    is given.  Each level of the tree is listed concurrently and, unlike build_ou_tree_branch, no
+    describe_organizational_unit call is needed for each ou.
+
+    :param self: organizations client
+    :param ParentId: the id of the root or ou to build the tree from
+    :param ShouldIncludeAccounts: set to True to list the accounts in each root and ou too
+    :param MaxConcurrency: the maximum number of calls that will be in flight at any one time
+    :return: OrganizationTree
+    """
+    return OrganizationTree.build(
+        self, parent_id=ParentId, include_accounts=ShouldIncludeAccounts, max_concurrency=MaxConcurrency,
+    )
+
+
+class OrganizationSnapshot(object):
+    """
+    OrganizationSnapshot crawls the whole organization once, listing each level of the tree concurrently, and keeps
+    indexes of it in memory so that ou path and account lookups do not need any further API calls.
+    This allows you to perform the following::
+
+        with ClientContextManager('organizations') as organizations:
+            snapshot = organizations.get_organization_snapshot(Ttl=600)
+            ou_id = organizations.convert_path_to_ou('/workloads/prod', Snapshot=snapshot)
+            accounts = organizations.list_children_nested(ParentId=ou_id, ChildType='ACCOUNT', Snapshot=snapshot)
+
+    The snapshot is rebuilt when refresh is called or, once it is older than ttl seconds, the next time it is read.
+    """
+    def __init__(self, client, ttl=300, max_concurrency=10):
+        super().__init__()
+        self.client = client
+        self.ttl = ttl
+        self.max_concurrency = max_concurrency
+        self.built_at = None
+        self._lock = threading.Lock()
+        self._indexes = None
+
+    def refresh(self):
+        """
+        Crawls the organization again and replaces the indexes in one go, so readers never see a partial snapshot
+        """
+        with self._lock:
+            self._rebuild()
+        return self
+
+    def is_stale(self):
+        return self.built_at is None or time.time() - self.built_at > self.ttl
+
+    def _get_indexes(self):
+        if self.is_stale():
+            with self._lock:
+                if self.is_stale():
+                    self._rebuild()
+        return self._indexes
+
+    def _rebuild(self):
+        self._indexes = self._crawl()
+        self.built_at = time.time()
+
+    def _crawl(self):
+        logger.info("Building organization snapshot")
+        tree = OrganizationTree.build(self.client, include_accounts=True, max_concurrency=self.max_concurrency)
+        indexes = dict(
+            roots=tree.roots,
+            path_to_ou={},
+            organizational_units={},
+            children={},
+            parents={},
+            accounts=tree.accounts,
+            accounts_by_name={},
+        )
+        for node in tree.walk():
+            indexes['children'][node.id] = dict(ORGANIZATIONAL_UNIT=node.children, ACCOUNT=node.accounts)
+            for account_id in node.accounts:
+                indexes['parents'][account_id] = node.id
+            if node.parent_id is None:
+                continue
+            indexes['parents'][node.id] = node.parent_id
+            indexes['organizational_units'][node.id] = node.to_organizational_unit()
+        if len(tree.roots) == 1:
+            indexes['path_to_ou']['/'] = tree.roots[0]
+        indexes['path_to_ou'].update({path: node_id for path, node_id in tree.paths.items() if path != '/'})
+        for account in tree.accounts.values():
+            indexes['accounts_by_name'].setdefault(account.get('Name'), account)
+
+        logger.info("Built organization snapshot of {} organizational units and {} accounts".format(
+            len(indexes['organizational_units']), len(indexes['accounts']),
+        ))
+        return indexes
+
+    def convert_path_to_ou(self, path):
+        """
+        Returns the id of the ou (or root when the path is /) for the given path.
+        This raises an exception when converting / and you have more than one root
+
+        :param path: organizations path
+        :return: the ou of the path specified
+        """
+        indexes = self._get_indexes()
+        if path == "/":
+            assert len(indexes['roots']) == 1, "You have {} roots".format(len(indexes['roots']))
+        organizational_unit_id = indexes['path_to_ou'].get(path)
+        if organizational_unit_id is None:
+            raise Exception("not found")
+        return organizational_unit_id
+
+    def get_children(self, parent_id, child_type):
+        """
+        Returns the children of the given root or ou in the same structure as list_children does
+
+        :param parent_id: the id of the root or ou
+        :param child_type: ACCOUNT or ORGANIZATIONAL_UNIT
+        :return: list of children in the structure of [{'Id': "0123456789010", 'Type': 'ACCOUNT'}]
+        """
+        children = self._get_indexes()['children'].get(parent_id, {})
+        return [dict(Id=child_id, Type=child_type) for child_id in children.get(child_type, [])]
+
+    def list_children_nested(self, parent_id, child_type):
+        """
+        Returns the same list list_children_nested on the organizations client would for the given parent_id and
+        child_type
+
+        :param parent_id: the id of the root or ou
+        :param child_type: ACCOUNT or ORGANIZATIONAL_UNIT
+        :return: list of children in the structure of [{'Id': "0123456789010"}, {'Id': "1009876543210"}]
+        """
+        if child_type not in ['ACCOUNT', 'ORGANIZATIONAL_UNIT']:
+            raise Exception('Unsupported ChildType: {}'.format(child_type))
+        children = self._get_indexes()['children']
+        result = []
+        to_flatten = [parent_id]
+        while len(to_flatten) > 0:
+            organizational_unit_id = to_flatten.pop()
+            if child_type == 'ACCOUNT':
+                result += self.get_children(organizational_unit_id, 'ACCOUNT')
+            else:
+                result.append(organizational_unit_id)
+            to_flatten += reversed(children.get(organizational_unit_id, {}).get('ORGANIZATIONAL_UNIT', []))
+        return result
+
+    def get_organizational_unit(self, organizational_unit_id):
+        """
+        Returns the ou in the structure list_organizational_units_for_parent returns them in
+        """
+        return self._get_indexes()['organizational_units'].get(organizational_unit_id)
+
+    def get_account(self, account_id):
+        """
+        Returns the account in the structure list_accounts returns them in
+        """
+        return self._get_indexes()['accounts'].get(account_id)
+
+    def get_account_by_name(self, name):
+        """
+        Returns the account with the given name in the structure list_accounts returns them in
+        """
+        return self._get_indexes()['accounts_by_name'].get(name)
+
+    def get_account_ids(self):
+        """
+        Returns the ids of every account in the organization
+        """
+        return list(self._get_indexes()['accounts'].keys())
+
+    def get_parent_chain(self, child_id):
+        """
+        Returns the ids of the parents of the given account or ou, starting with its direct parent and ending with
+        the root
+        """
+        parents = self._get_indexes()['parents']
+        chain = []
+        parent_id = parents.get(child_id)
+        while parent_id is not None:
+            chain.append(parent_id)
+            parent_id = parents.get(parent_id)
+        return chain
+
+
+def get_organization_snapshot(self, Ttl=300, MaxConcurrency=10):
+    """
+    This method will crawl the organization and return an OrganizationSnapshot of it.  The snapshot can be passed to
+    convert_path_to_ou and list_children_nested so they do not need to make any API calls.
+
+    :param self: organizations client
+    :param Ttl: the number of seconds after which the snapshot will be rebuilt the next time it is read
+    :param MaxConcurrency: the maximum number of calls that will be in flight at any one time while crawling
+    :return: OrganizationSnapshot
+    """
+    return OrganizationSnapshot(self, ttl=Ttl, max_concurrency=MaxConcurrency).refresh()
+
+
+class PolicyAttachmentIndex(object):
+    """
+    PolicyAttachmentIndex lists each policy of the given types once and the targets of every policy concurrently, and
+    uses an OrganizationSnapshot to work out which policies apply to each account, whether attached to the account
+    itself or inherited from one of its parents.
+    This allows you to perform the following::
+
+        with ClientContextManager('organizations') as organizations:
+            index = organizations.get_policy_attachment_index(PolicyTypes=['SERVICE_CONTROL_POLICY'])
+            for policy in index.get_policies_for_account('0123456789010'):
+                print(policy.get('Name'))
+            print(index.get_accounts_for_policy('p-examplepolicyid111'))
+
+    Once built, lookups do not need any further API calls.  The index is only rebuilt when refresh is called.
+    """
+    def __init__(self, client, policy_types=None, snapshot=None, max_concurrency=10):
+        super().__init__()
+        self.client = client
+        self.policy_types = policy_types or ['SERVICE_CONTROL_POLICY']
+        self.snapshot = snapshot
+        self.max_concurrency = max_concurrency
+        self.built_at = None
+        self._lock = threading.Lock()
+        self._indexes = None
+
+    def refresh(self):
+        """
+        Lists the policies and their targets again and replaces the indexes in one go
+        """
+        with self._lock:
+            self._indexes = self._build()
+            self.built_at = time.time()
+        return self
+
+    def _build(self):
+        snapshot = self.snapshot
+        if snapshot is None:
+            snapshot = OrganizationSnapshot(self.client, max_concurrency=self.max_concurrency)
+
+        policies = {}
+        for policy_type in self.policy_types:
+            for policy in self.client.list_policies_iter(Filter=policy_type):
+                policies[policy.get('Id')] = policy
+        logger.info("Listing the targets of {} policies".format(len(policies)))
+
+        attached = {}
+        with futures.ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            targets = {
+                policy_id: executor.submit(self.client.list_targets_for_policy_single_page, PolicyId=policy_id)
+                for policy_id in policies.keys()
+            }
+            for policy_id, future in targets.items():
+                for target in future.result().get('Targets', []):
+                    attached.setdefault(target.get('TargetId'), []).append(policy_id)
+
+        inherited = {}
+
+        def get_inherited(target_id):
+            if target_id not in inherited:
+                parent_chain = snapshot.get_parent_chain(target_id)
+                result = list(attached.get(target_id, []))
+                if len(parent_chain) > 0:
+                    result += [policy_id for policy_id in get_inherited(parent_chain[0]) if policy_id not in result]
+                inherited[target_id] = result
+            return inherited[target_id]
+
+        accounts_for_policy = {policy_id: [] for policy_id in policies.keys()}
+        policies_for_account = {}
+        for account_id in snapshot.get_account_ids():
+            policies_for_account[account_id] = get_inherited(account_id)
+            for policy_id in policies_for_account[account_id]:
+                accounts_for_policy[policy_id].append(account_id)
+
+        return dict(
+            policies=policies,
+            attached=attached,
+            policies_for_account=policies_for_account,
+            accounts_for_policy=accounts_for_policy,
+        )
+
+    def _get_indexes(self):
+        if self._indexes is None:
+            self.refresh()
+        return self._indexes
+
+    def get_policy(self, policy_id):
+        """
+        Returns the policy in the structure list_policies returns them in
+        """
+        return self._get_indexes()['policies'].get(policy_id)
+
+    def get_policies_for_target(self, target_id):
+        """
+        Returns the policies attached directly to the given root, ou or account
+        """
+        indexes = self._get_indexes()
+        return [indexes['policies'][policy_id] for policy_id in indexes['attached'].get(target_id, [])]
+
+    def get_policies_for_account(self, account_id, policy_type=None):
+        """
+        Returns the policies that apply to the given account, those attached to it followed by those attached to each
+        of its parents in turn
+
+        :param account_id: the id of the account
+        :param policy_type: optionally only return policies of this type, eg SERVICE_CONTROL_POLICY
+        :return: list of policies in the structure list_policies returns them in
+        """
+        indexes = self._get_indexes()
+        return [
+            indexes['policies'][policy_id] for policy_id in indexes['policies_for_account'].get(account_id, [])
+            if policy_type is None or indexes['policies'][policy_id].get('Type') == policy_type
+        ]
+
+    def get_accounts_for_policy(self, policy_id):
+        """
+        Returns the ids of the accounts the given policy applies to, directly or through one of their parents
+        """
+        return self._get_indexes()['accounts_for_policy'].get(policy_id, [])
+
+
+def get_policy_attachment_index(self, PolicyTypes=None, Snapshot=None, MaxConcurrency=10):
+    """
+    This method will list the policies of the given types and their targets and return a PolicyAttachmentIndex of
+    them.  The OU tree is taken from Snapshot, or crawled when no Snapshot is given.
+
+    :param self: organizations client
+    :param PolicyTypes: list of the policy types to index, defaulting to SERVICE_CONTROL_POLICY
+    :param Snapshot: an optional OrganizationSnapshot to use for the parents of each account
+    :param MaxConcurrency: the maximum number of calls that will be in flight at any one time
+    :return: PolicyAttachmentIndex
+    """
+    return PolicyAttachmentIndex(
+        self, policy_types=PolicyTypes, snapshot=Snapshot, max_concurrency=MaxConcurrency,
+    ).refresh()
+
+
 def make_better(client):
     client.list_accounts_single_page = types.MethodType(list_accounts_single_page, client)
+    client.list_accounts_iter = types.MethodType(list_accounts_iter, client)
     client.find_match = types.MethodType(find_match, client)
     client.build_ou_tree_branch = types.MethodType(build_ou_tree_branch, client)
     client.convert_path_to_ou = types.MethodType(convert_path_to_ou, client)
     client.list_children_single_page = types.MethodType(list_children_single_page, client)
+    client.list_children_iter = types.MethodType(list_children_iter, client)
     client.list_children_nested = types.MethodType(list_children_nested, client)
     client.list_policies_single_page = types.MethodType(list_policies_single_page, client)
+    client.list_policies_iter = types.MethodType(list_policies_iter, client)
     client.list_policies_for_target_single_page = types.MethodType(list_policies_for_target_single_page, client)
+    client.list_policies_for_target_iter = types.MethodType(list_policies_for_target_iter, client)
     client.list_organizational_units_for_parent_single_page = types.MethodType(list_organizational_units_for_parent_single_page, client)
+    client.list_organizational_units_for_parent_iter = types.MethodType(list_organizational_units_for_parent_iter, client)
     client.list_roots_single_page = types.MethodType(list_roots_single_page, client)
+    client.list_roots_iter = types.MethodType(list_roots_iter, client)
     client.list_parents_single_page = types.MethodType(list_parents_single_page, client)
+    client.list_parents_iter = types.MethodType(list_parents_iter, client)
     client.list_delegated_administrators_single_page = types.MethodType(list_delegated_administrators_single_page, client)
+    client.list_delegated_administrators_iter = types.MethodType(list_delegated_administrators_iter, client)
     client.list_delegated_services_for_account_single_page = types.MethodType(list_delegated_services_for_account_single_page, client)
+    client.list_delegated_services_for_account_iter = types.MethodType(list_delegated_services_for_account_iter, client)
     client.list_targets_for_policy_single_page = types.MethodType(list_targets_for_policy_single_page, client)
+    client.list_targets_for_policy_iter = types.MethodType(list_targets_for_policy_iter, client)
+    client.list_accounts_for_parent_single_page = types.MethodType(list_accounts_for_parent_single_page, client)
+    client.list_accounts_for_parent_iter = types.MethodType(list_accounts_for_parent_iter, client)
+    client.build_ou_tree = types.MethodType(build_ou_tree, client)
+    client.get_organization_snapshot = types.MethodType(get_organization_snapshot, client)
+    client.get_policy_attachment_index = types.MethodType(get_policy_attachment_index, client)
     return client
@@ -1,7 +1,14 @@
 import types
+import collections
+import datetime
+import json
 import logging
+import os
+import threading
+import time
+from concurrent import futures
 
-from .utils import slurp
+from .utils import slurp, slurp_iter, backoff_delays, RateLimiter
 
 logger = logging.getLogger(__file__)
 
@@ -23,6 +30,23 @@ def search_products_as_admin_single_page(self, **kwargs):
     )
 
 
+def search_products_as_admin_iter(self, **kwargs):
+    """
+    This will continue to call search_products_as_admin until there are no more pages left to retrieve.  It will yield each of
+    the ProductViewDetails as each page is retrieved rather than waiting for every page.
+
+    :param self: servicecatalog client
+    :param kwargs: these are passed onto the search_products_as_admin method call
+    :return: generator of servicecatalog_client.search_products_as_admin.response.ProductViewDetails
+    """
+    return slurp_iter(
+        'search_products_as_admin',
+        self.search_products_as_admin,
+        'ProductViewDetails',
+        **kwargs
+    )
+
+
 def list_principals_for_portfolio_single_page(self, **kwargs):
     """
     This will continue to call list_principals_for_portfolio until there are no more pages left to retrieve.  It will return
@@ -40,6 +64,23 @@ def list_principals_for_portfolio_single_page(self, **kwargs):
     )
 
 
+def list_principals_for_portfolio_iter(self, **kwargs):
+    """
+    This will continue to call list_principals_for_portfolio until there are no more pages left to retrieve.  It will yield each of
+    the Principals as each page is retrieved rather than waiting for every page.
+
+    :param self: servicecatalog client
+    :param kwargs: these are passed onto the list_principals_for_portfolio method call
+    :return: generator of servicecatalog_client.list_principals_for_portfolio.response.Principals
+    """
+    return slurp_iter(
+        'list_principals_for_portfolio',
+        self.list_principals_for_portfolio,
+        'Principals',
+        **kwargs
+    )
+
+
 def list_portfolios_single_page(self, **kwargs):
     """
     This will continue to call list_portfolios until there are no more pages left to retrieve.  It will return
@@ -57,6 +98,23 @@ def list_portfolios_single_page(self, **kwargs):
     )
 
 
+def list_portfolios_iter(self, **kwargs):
+    """
+    This will continue to call list_portfolios until there are no more pages left to retrieve.  It will yield each of
+    the PortfolioDetails as each page is retrieved rather than waiting for every page.
+
+    :param self: servicecatalog client
+    :param kwargs: these are passed onto the list_portfolios method call
+    :return: generator of servicecatalog_client.list_portfolios.response.PortfolioDetails
+    """
+    return slurp_iter(
+        'list_portfolios',
+        self.list_portfolios,
+        'PortfolioDetails',
+        **kwargs
+    )
+
+
 def list_provisioning_artifacts_single_page(self, **kwargs):
     """
     This will continue to call list_provisioning_artifacts until there are no more pages left to retrieve.  It will return
@@ -74,6 +132,23 @@ def list_provisioning_artifacts_single_page(self, **kwargs):
     )
 
 
+def list_provisioning_artifacts_iter(self, **kwargs):
+    """
+    This will continue to call list_provisioning_artifacts until there are no more pages left to retrieve.  It will yield each of
+    the ProvisioningArtifactDetails as each page is retrieved rather than waiting for every page.
+
+    :param self: servicecatalog client
+    :param kwargs: these are passed onto the list_provisioning_artifacts method call
+    :return: generator of servicecatalog_client.list_provisioning_artifacts.response.ProvisioningArtifactDetails
+    """
+    return slurp_iter(
+        'list_provisioning_artifacts',
+        self.list_provisioning_artifacts,
+        'ProvisioningArtifactDetails',
+        **kwargs
+    )
+
+
 def list_portfolios_for_product_single_page(self, **kwargs):
     """
     This will continue to call list_portfolios_for_product until there are no more pages left to retrieve.  It will return
@@ -91,6 +166,23 @@ def list_portfolios_for_product_single_page(self, **kwargs):
     )
 
 
+def list_portfolios_for_product_iter(self, **kwargs):
+    """
+    This will continue to call list_portfolios_for_product until there are no more pages left to retrieve.  It will yield each of
+    the PortfolioDetails as each page is retrieved rather than waiting for every page.
+
+    :param self: servicecatalog client
+    :param kwargs: these are passed onto the list_portfolios_for_product method call
+    :return: generator of servicecatalog_client.list_portfolios_for_product.response.PortfolioDetails
+    """
+    return slurp_iter(
+        'list_portfolios_for_product',
+        self.list_portfolios_for_product,
+        'PortfolioDetails',
+        **kwargs
+    )
+
+
 def list_provisioned_product_plans_single_page(self, **kwargs):
     """
     This will continue to call list_provisioned_product_plans until there are no more pages left to retrieve.  It will return
@@ -108,6 +200,23 @@ def list_provisioned_product_plans_single_page(self, **kwargs):
     )
 
 
+def list_provisioned_product_plans_iter(self, **kwargs):
+    """
+    This will continue to call list_provisioned_product_plans until there are no more pages left to retrieve.  It will yield each of
+    the ProvisionedProductPlans as each page is retrieved rather than waiting for every page.
+
+    :param self: servicecatalog client
+    :param kwargs: these are passed onto the list_provisioned_product_plans method call
+    :return: generator of servicecatalog_client.list_provisioned_product_plans.response.ProvisionedProductPlans
+    """
+    return slurp_iter(
+        'list_provisioned_product_plans',
+        self.list_provisioned_product_plans,
+        'ProvisionedProductPlans',
+        **kwargs
+    )
+
+
 def describe_provisioned_product_plan_single_page(self, **kwargs):
     """
     This will continue to call describe_provisioned_product_plan until there are no more pages left to retrieve.  It will return
@@ -125,6 +234,23 @@ def describe_provisioned_product_plan_single_page(self, **kwargs):
     )
 
 
+def describe_provisioned_product_plan_iter(self, **kwargs):
+    """
+    This will continue to call describe_provisioned_product_plan until there are no more pages left to retrieve.  It will yield each of
+    the ProvisionedProductPlanDetails as each page is retrieved rather than waiting for every page.
+
+    :param self: servicecatalog client
+    :param kwargs: these are passed onto the describe_provisioned_product_plan method call
+    :return: generator of servicecatalog_client.describe_provisioned_product_plan.response.ProvisionedProductPlanDetails
+    """
+    return slurp_iter(
+        'describe_provisioned_product_plan',
+        self.describe_provisioned_product_plan,
+        'ProvisionedProductPlanDetails',
+        **kwargs
+    )
+
+
 def search_provisioned_products_single_page(self, **kwargs):
     """
     This will continue to call search_provisioned_products until there are no more pages left to retrieve.  It will return
@@ -142,6 +268,23 @@ def search_provisioned_products_single_page(self, **kwargs):
     )
 
 
+def search_provisioned_products_iter(self, **kwargs):
+    """
+    This will continue to call search_provisioned_products until there are no more pages left to retrieve.  It will yield each of
+    the ProvisionedProducts as each page is retrieved rather than waiting for every page.
+
+    :param self: servicecatalog client
+    :param kwargs: these are passed onto the search_provisioned_products method call
+    :return: generator of servicecatalog_client.search_provisioned_products.response.ProvisionedProducts
+    """
+    return slurp_iter(
+        'search_provisioned_products',
+        self.search_provisioned_products,
+        'ProvisionedProducts',
+        **kwargs
+    )
+
+
 def list_launch_paths_single_page(self, **kwargs):
     """
     This will continue to call list_launch_paths until there are no more pages left to retrieve.  It will return
@@ -159,6 +302,23 @@ def list_launch_paths_single_page(self, **kwargs):
     )
 
 
+def list_launch_paths_iter(self, **kwargs):
+    """
+    This will continue to call list_launch_paths until there are no more pages left to retrieve.  It will yield each of
+    the LaunchPathSummaries as each page is retrieved rather than waiting for every page.
+
+    :param self: servicecatalog client
+    :param kwargs: these are passed onto the list_launch_paths method call
+    :return: generator of servicecatalog_client.list_launch_paths.response.LaunchPathSummaries
+    """
+    return slurp_iter(
+        'list_launch_paths',
+        self.list_launch_paths,
+        'LaunchPathSummaries',
+        **kwargs
+    )
+
+
 def list_accepted_portfolio_shares_single_page(self, **kwargs):
     """
     This will continue to call list_accepted_portfolio_shares until there are no more pages left to retrieve.  It will return
@@ -176,6 +336,23 @@ def list_accepted_portfolio_shares_single_page(self, **kwargs):
     )
 
 
+def list_accepted_portfolio_shares_iter(self, **kwargs):
+    """
+    This will continue to call list_accepted_portfolio_shares until there are no more pages left to retrieve.  It will yield each of
+    the PortfolioDetails as each page is retrieved rather than waiting for every page.
+
+    :param self: servicecatalog client
+    :param kwargs: these are passed onto the list_accepted_portfolio_shares method call
+    :return: generator of servicecatalog_client.list_accepted_portfolio_shares.response.PortfolioDetails
+    """
+    return slurp_iter(
+        'list_accepted_portfolio_shares',
+        self.list_accepted_portfolio_shares,
+        'PortfolioDetails',
+        **kwargs
+    )
+
+
 def scan_provisioned_products_single_page(self, **kwargs):
     """
     This will continue to call scan_provisioned_products until there are no more pages left to retrieve.  It will return
@@ -193,6 +370,23 @@ def scan_provisioned_products_single_page(self, **kwargs):
     )
 
 
+def scan_provisioned_products_iter(self, **kwargs):
+    """
+    This will continue to call scan_provisioned_products until there are no more pages left to retrieve.  It will yield each of
+    the ProvisionedProducts as each page is retrieved rather than waiting for every page.
+
+    :param self: servicecatalog client
+    :param kwargs: these are passed onto the scan_provisioned_products method call
+    :return: generator of servicecatalog_client.scan_provisioned_products.response.ProvisionedProducts
+    """
+    return slurp_iter(
+        'scan_provisioned_products',
+        self.scan_provisioned_products,
+        'ProvisionedProducts',
+        **kwargs
+    )
+
+
 def list_portfolio_access_single_page(self, **kwargs):
     """
     This will continue to call list_portfolio_access until there are no more pages left to retrieve.  It will return
@@ -210,21 +404,335 @@ def list_portfolio_access_single_page(self, **kwargs):
     )
 
 
+def list_portfolio_access_iter(self, **kwargs):
+    """
+    This will continue to call list_portfolio_access until there are no more pages left to retrieve.  It will yield each of
+    the AccountIds as each page is retrieved rather than waiting for every page.
+
+    :param self: servicecatalog client
+    :param kwargs: these are passed onto the list_portfolio_access method call
+    :return: generator of servicecatalog_client.list_portfolio_access.response.AccountIds
+    """
+    return slurp_iter(
+        'list_portfolio_access',
+        self.list_portfolio_access,
+        'AccountIds',
+        **kwargs
+    )
+
+
+def crawl_catalog(self, MaxConcurrency=10, ShouldIncludeLaunchPaths=True, **kwargs):
+    """
+    This will crawl every portfolio in the catalog, along with the products, principals and account access of each
+    portfolio and the provisioning artifacts and launch paths of each product.  Up to MaxConcurrency calls are made at
+    once and products shared by more than one portfolio are only crawled once.
+
+    :param self: servicecatalog client
+    :param MaxConcurrency: the maximum number of calls to make at once
+    :param ShouldIncludeLaunchPaths: set to False to skip listing the launch paths of each product
+    :param kwargs: these are passed onto the list_portfolios method call
+    :return: dict of Portfolios, Products, ProvisioningArtifacts and LaunchPaths keyed by id along with
+        PortfolioProducts, ProductPortfolios, PortfolioPrincipals and PortfolioAccess
+    """
+    catalog = dict(
+        Portfolios={},
+        Products={},
+        ProvisioningArtifacts={},
+        LaunchPaths={},
+        PortfolioProducts={},
+        ProductPortfolios={},
+        PortfolioPrincipals={},
+        PortfolioAccess={},
+    )
+    for portfolio in self.list_portfolios_iter(**kwargs):
+        catalog['Portfolios'][portfolio.get('Id')] = portfolio
+    logger.info("Crawling {} portfolios".format(len(catalog['Portfolios'])))
+
+    in_flight = {}
+    executor = futures.ThreadPoolExecutor(max_workers=MaxConcurrency)
+
+    def submit(func, key, resource_id, **call_kwargs):
+        in_flight[executor.submit(func, **call_kwargs)] = (key, resource_id)
+
+    try:
+        for portfolio_id in catalog['Portfolios'].keys():
+            for func, key in [
+                (self.search_products_as_admin_single_page, 'PortfolioProducts'),
+                (self.list_principals_for_portfolio_single_page, 'PortfolioPrincipals'),
+                (self.list_portfolio_access_single_page, 'PortfolioAccess'),
+            ]:
+                submit(func, key, portfolio_id, PortfolioId=portfolio_id)
+
+        while len(in_flight) > 0:
+            done, _ = futures.wait(in_flight, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                key, resource_id = in_flight.pop(future)
+                response = future.result()
+                if key == 'PortfolioProducts':
+                    catalog['PortfolioProducts'][resource_id] = []
+                    for product in response.get('ProductViewDetails', []):
+                        product_id = product.get('ProductViewSummary').get('ProductId')
+                        catalog['PortfolioProducts'][resource_id].append(product_id)
+                        catalog['ProductPortfolios'].setdefault(product_id, []).append(resource_id)
+                        if product_id in catalog['Products']:
+                            continue
+                        catalog['Products'][product_id] = product
+                        submit(
+                            self.list_provisioning_artifacts_single_page, 'ProvisioningArtifacts', product_id,
+                            ProductId=product_id,
+                        )
+                        if ShouldIncludeLaunchPaths:
+                            submit(self.list_launch_paths_single_page, 'LaunchPaths', product_id, ProductId=product_id)
+                elif key == 'PortfolioPrincipals':
+                    catalog[key][resource_id] = response.get('Principals', [])
+                elif key == 'PortfolioAccess':
+                    catalog[key][resource_id] = response.get('AccountIds', [])
+                elif key == 'ProvisioningArtifacts':
+                    catalog[key][resource_id] = response.get('ProvisioningArtifactDetails', [])
+                elif key == 'LaunchPaths':
+                    catalog[key][resource_id] = response.get('LaunchPathSummaries', [])
+    finally:
+        for future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=False)
+    return catalog
+
+
+record_in_progress_statuses = ['CREATED', 'IN_PROGRESS']
+
+ProvisioningResult = collections.namedtuple('ProvisioningResult', ['operation', 'result', 'exception'])
+
+
+def provision_products_and_wait(
+        self, Operations, MaxConcurrency=10, MaxRequestsPerSecond=5, MinDelay=5, MaxDelay=60, MaxRecordsPerPoll=10,
+):
+    """
+    This will call provision_product or update_provisioned_product for each of the given operations, with at most
+    MaxConcurrency of them in progress at once and at most MaxRequestsPerSecond calls made each second, and yield a
+    ProvisioningResult for each one as soon as it completes.
+
+    All of the operations in progress are tracked by one poller.  Each poll calls describe_record for at most
+    MaxRecordsPerPoll of the records, taking turns so every record is checked, so the number of calls made grows with
+    how long the operations take rather than with how many of them there are.  Polling starts every MinDelay seconds
+    and backs off to every MaxDelay seconds, going back to MinDelay whenever an operation completes.
+
+    The result of each ProvisioningResult is the describe_record response once the record has finished, whose
+    RecordDetail.Status is SUCCEEDED, FAILED or IN_PROGRESS_IN_ERROR.  When the operation could not be started, or
+    its record could not be described, the exception is given instead and the other operations carry on.
+
+    :param self: servicecatalog client
+    :param Operations: list of the args to pass onto each call.  Each can have an Operation of PROVISION (the default)
+        or UPDATE, which is removed before the args are passed on
+    :param MaxConcurrency: the maximum number of operations to have in progress at once
+    :param MaxRequestsPerSecond: the maximum number of calls to make each second
+    :param MinDelay: the number of seconds to wait between polls to begin with
+    :param MaxDelay: the most number of seconds to wait between polls
+    :param MaxRecordsPerPoll: the maximum number of records to describe in each poll
+    :return: generator of ProvisioningResult
+    """
+    rate_limiter = RateLimiter(MaxRequestsPerSecond)
+    to_submit = collections.deque(Operations)
+    submitting = {}
+    in_progress = collections.OrderedDict()
+    delays = backoff_delays(MinDelay, MaxDelay)
+
+    def submit(operation):
+        operation = dict(operation)
+        if operation.pop('Operation', 'PROVISION') == 'UPDATE':
+            return rate_limiter.call(self.update_provisioned_product, **operation).get('RecordDetail')
+        return rate_limiter.call(self.provision_product, **operation).get('RecordDetail')
+
+    with futures.ThreadPoolExecutor(max_workers=MaxConcurrency) as executor:
+        while len(to_submit) > 0 or len(submitting) > 0 or len(in_progress) > 0:
+            while len(to_submit) > 0 and len(submitting) + len(in_progress) < MaxConcurrency:
+                operation = to_submit.popleft()
+                submitting[executor.submit(submit, operation)] = operation
+
+            if len(submitting) > 0:
+                done, _ = futures.wait(submitting, return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    operation = submitting.pop(future)
+                    exception = future.exception()
+                    if exception is not None:
+                        logger.error("Could not start {}: {}".format(operation.get('ProvisionedProductName'), exception))
+                        yield ProvisioningResult(operation, None, exception)
+                        continue
+                    record_detail = future.result()
+                    logger.info("Started: {} for {}".format(
+                        record_detail.get('RecordId'), record_detail.get('ProvisionedProductName'))
+                    )
+                    in_progress[record_detail.get('RecordId')] = operation
+                continue
+
+            time.sleep(next(delays))
+            for record_id in list(in_progress.keys())[:MaxRecordsPerPoll]:
+                operation = in_progress[record_id]
+                try:
+                    response = rate_limiter.call(self.describe_record, Id=record_id)
+                except Exception as e:
+                    logger.error("Could not describe {}: {}".format(record_id, e))
+                    del in_progress[record_id]
+                    yield ProvisioningResult(operation, None, e)
+                    continue
+                status = response.get('RecordDetail').get('Status')
+                if status in record_in_progress_statuses:
+                    in_progress.move_to_end(record_id)
+                    continue
+                logger.info("Finished: {} with status: {}".format(record_id, status))
+                del in_progress[record_id]
+                delays = backoff_delays(MinDelay, MaxDelay)
+                yield ProvisioningResult(operation, response, None)
+            logger.info("Operations in progress: {}, waiting to start: {}".format(len(in_progress), len(to_submit)))
+
+
+search_provisioned_products_max_page_size = 100
+scan_provisioned_products_max_page_size = 20
+
+provisioned_product_fingerprint_keys = [
+    'Status', 'LastRecordId', 'LastProvisioningRecordId', 'LastSuccessfulProvisioningRecordId',
+    'ProvisioningArtifactId', 'ProductId',
+]
+
+
+class ProvisionedProductsSync(object):
+    """
+    ProvisionedProductsSync keeps a snapshot of the provisioned products seen by the last sync so each sync only
+    returns the provisioned products that were added, changed or removed since the previous one.
+    This allows you to perform the following::
+
+        with ClientContextManager('servicecatalog') as servicecatalog:
+            sync = servicecatalog.get_provisioned_products_sync(Path='/var/cache/provisioned-products.json')
+            changes = sync.sync()
+            for provisioned_product in changes.get('Added') + changes.get('Changed'):
+                print(provisioned_product.get('Id'), provisioned_product.get('Status'))
+
+    A provisioned product has changed when its status, or any of its record, artifact or product ids, differ.  Only
+    these fields are kept in the snapshot, which is held in memory and, when path is given, written to that file as JSON
+    so the next run can carry on from it.  The first sync, or one without a snapshot, returns everything as Added.
+
+    search_provisioned_products is used by default and scan_provisioned_products when use_search is False, each with
+    the largest page size it allows (100 and 20).  Neither has a filter for products updated since a given time, so each sync still lists
+    every provisioned product.
+    """
+    def __init__(self, client, path=None, use_search=True, **kwargs):
+        super().__init__()
+        self.client = client
+        self.path = path
+        self.use_search = use_search
+        self.kwargs = kwargs
+        self.synced_at = None
+        self._fingerprints = None
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            with open(path, 'r') as f:
+                snapshot = json.load(f)
+            self.synced_at = snapshot.get('SyncedAt')
+            self._fingerprints = snapshot.get('Fingerprints')
+
+    def _fingerprint(self, provisioned_product):
+        return [provisioned_product.get(key) for key in provisioned_product_fingerprint_keys]
+
+    def _list(self):
+        kwargs = dict(self.kwargs)
+        if self.use_search:
+            kwargs.setdefault('PageSize', search_provisioned_products_max_page_size)
+            return self.client.search_provisioned_products_iter(**kwargs)
+        kwargs.setdefault('PageSize', scan_provisioned_products_max_page_size)
+        return self.client.scan_provisioned_products_iter(**kwargs)
+
+    def _save(self):
+        temporary_path = '{}.tmp'.format(self.path)
+        with open(temporary_path, 'w') as f:
+            json.dump(dict(SyncedAt=self.synced_at, Fingerprints=self._fingerprints), f)
+        os.replace(temporary_path, self.path)
+
+    def sync(self):
+        """
+        Lists the provisioned products and compares them with the snapshot, which is then replaced
+
+        :return: dict of Added and Changed provisioned products and the Removed provisioned product ids
+        """
+        with self._lock:
+            previous = self._fingerprints or {}
+            fingerprints = {}
+            added = []
+            changed = []
+            for provisioned_product in self._list():
+                provisioned_product_id = provisioned_product.get('Id')
+                fingerprint = self._fingerprint(provisioned_product)
+                fingerprints[provisioned_product_id] = fingerprint
+                if provisioned_product_id not in previous:
+                    added.append(provisioned_product)
+                elif previous[provisioned_product_id] != fingerprint:
+                    changed.append(provisioned_product)
+            removed = [
+                provisioned_product_id for provisioned_product_id in previous.keys()
+                if provisioned_product_id not in fingerprints
+            ]
+            self._fingerprints = fingerprints
+            self.synced_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+            if self.path is not None:
+                self._save()
+        logger.info("Synced provisioned products, added: {}, changed: {}, removed: {}".format(
+            len(added), len(changed), len(removed))
+        )
+        return dict(Added=added, Changed=changed, Removed=removed)
+
+    def reset(self):
+        """
+        Forgets the snapshot so the next sync returns every provisioned product as Added
+        """
+        with self._lock:
+            self._fingerprints = None
+            self.synced_at = None
+            if self.path is not None and os.path.exists(self.path):
+                os.remove(self.path)
+
+
+def get_provisioned_products_sync(self, Path=None, ShouldUseSearch=True, **kwargs):
+    """
+    This method will return a ProvisionedProductsSync whose sync method returns the provisioned products added, changed
+    or removed since the previous sync
+
+    :param self: servicecatalog client
+    :param Path: an optional file to keep the snapshot in between runs
+    :param ShouldUseSearch: set to False to use scan_provisioned_products rather than search_provisioned_products
+    :param kwargs: these are passed onto the search_provisioned_products or scan_provisioned_products method call
+    :return: ProvisionedProductsSync
+    """
+    return ProvisionedProductsSync(self, path=Path, use_search=ShouldUseSearch, **kwargs)
+
+
 def make_better(client):
     client.search_products_as_admin_single_page = types.MethodType(search_products_as_admin_single_page, client)
+    client.search_products_as_admin_iter = types.MethodType(search_products_as_admin_iter, client)
     client.list_portfolios_single_page = types.MethodType(list_portfolios_single_page, client)
+    client.list_portfolios_iter = types.MethodType(list_portfolios_iter, client)
     client.list_provisioning_artifacts_single_page = types.MethodType(list_provisioning_artifacts_single_page, client)
+    client.list_provisioning_artifacts_iter = types.MethodType(list_provisioning_artifacts_iter, client)
     client.list_portfolios_for_product_single_page = types.MethodType(list_portfolios_for_product_single_page, client)
+    client.list_portfolios_for_product_iter = types.MethodType(list_portfolios_for_product_iter, client)
     client.list_provisioned_product_plans_single_page = types.MethodType(list_provisioned_product_plans_single_page,
                                                                          client)
+    client.list_provisioned_product_plans_iter = types.MethodType(list_provisioned_product_plans_iter, client)
     client.describe_provisioned_product_plan_single_page = types.MethodType(describe_provisioned_product_plan_single_page,
                                                                          client)
+    client.describe_provisioned_product_plan_iter = types.MethodType(describe_provisioned_product_plan_iter, client)
     client.search_provisioned_products_single_page = types.MethodType(search_provisioned_products_single_page, client)
+    client.search_provisioned_products_iter = types.MethodType(search_provisioned_products_iter, client)
     client.list_launch_paths_single_page = types.MethodType(list_launch_paths_single_page, client)
+    client.list_launch_paths_iter = types.MethodType(list_launch_paths_iter, client)
     client.list_principals_for_portfolio_single_page = types.MethodType(list_principals_for_portfolio_single_page,
                                                                         client)
+    client.list_principals_for_portfolio_iter = types.MethodType(list_principals_for_portfolio_iter, client)
     client.list_accepted_portfolio_shares_single_page = types.MethodType(list_accepted_portfolio_shares_single_page,
                                                                          client)
+    client.list_accepted_portfolio_shares_iter = types.MethodType(list_accepted_portfolio_shares_iter, client)
     client.scan_provisioned_products_single_page = types.MethodType(scan_provisioned_products_single_page, client)
+    client.scan_provisioned_products_iter = types.MethodType(scan_provisioned_products_iter, client)
     client.list_portfolio_access_single_page = types.MethodType(list_portfolio_access_single_page, client)
+    client.list_portfolio_access_iter = types.MethodType(list_portfolio_access_iter, client)
+    client.crawl_catalog = types.MethodType(crawl_catalog, client)
+    client.provision_products_and_wait = types.MethodType(provision_products_and_wait, client)
+    client.get_provisioned_products_sync = types.MethodType(get_provisioned_products_sync, client)
     return client
@@ -1,6 +1,11 @@
 import types
+import json
 import logging
+import threading
 import time
+from concurrent import futures
+
+from .utils import slurp, slurp_iter, RateLimiter
 
 
 logger = logging.getLogger(__file__)
@@ -18,6 +23,7 @@ def put_parameter_and_wait(self, Name, **kwargs):
     :return: ssm.get_parameter.response
     """
     new_version = self.put_parameter(Name=Name, **kwargs).get('Version')
+    self.parameters_by_path_cache.invalidate(Name)
     count = 0
     current_parameter = {
         "Parameter": {
@@ -39,6 +45,130 @@ def put_parameter_and_wait(self, Name, **kwargs):
     return current_parameter
 
 
+get_parameters_max_names = 10
+
+
+def put_parameters_and_wait(self, Parameters, MaxConcurrency=5, MaxRequestsPerSecond=3):
+    """
+    This will call put_parameter for each of the given parameters at the same time, limited to MaxRequestsPerSecond
+    (which is lowered whenever a call is throttled), and then ensure they have all been successfully put by checking
+    them with get_parameters, 10 at a time.
+
+    :param self: ssm client
+    :param Parameters: list of the args to pass onto each put_parameter method call
+    :param MaxConcurrency: the maximum number of put_parameter calls to make at once
+    :param MaxRequestsPerSecond: the maximum number of calls to make each second
+    :return: ssm.get_parameters.response with the Parameters for all of the given parameters
+    """
+    rate_limiter = RateLimiter(MaxRequestsPerSecond)
+    with futures.ThreadPoolExecutor(max_workers=MaxConcurrency) as executor:
+        put_futures = {
+            parameter.get('Name'): executor.submit(rate_limiter.call, self.put_parameter, **parameter)
+            for parameter in Parameters
+        }
+        new_versions = {name: future.result().get('Version') for name, future in put_futures.items()}
+    for name in new_versions.keys():
+        self.parameters_by_path_cache.invalidate(name)
+
+    confirmed = {}
+    count = 0
+    while len(confirmed) < len(new_versions):
+        count += 1
+        if count > put_parameter_and_wait_max_retries:
+            missing = [name for name in new_versions.keys() if name not in confirmed]
+            raise Exception(f"Putting and waiting for params {', '.join(missing)} failed")
+        time.sleep(1)
+        names = [name for name in new_versions.keys() if name not in confirmed]
+        for i in range(0, len(names), get_parameters_max_names):
+            response = rate_limiter.call(self.get_parameters, Names=names[i:i + get_parameters_max_names])
+            for parameter in response.get('Parameters', []):
+                if parameter.get('Version') >= new_versions[parameter.get('Name')]:
+                    confirmed[parameter.get('Name')] = parameter
+    return dict(Parameters=[confirmed[name] for name in new_versions.keys()])
+
+
+def get_parameters_by_path_single_page(self, **kwargs):
+    """
+    This will continue to call get_parameters_by_path until there are no more pages left to retrieve.
+    It will return the aggregated response in the same structure as get_parameters_by_path does.
+
+    :param self: ssm client
+    :param kwargs: these are passed onto the get_parameters_by_path method call
+    :return: ssm_client.get_parameters_by_path.response
+    """
+    return slurp(
+        'get_parameters_by_path',
+        self.get_parameters_by_path,
+        'Parameters',
+        'NextToken', 'NextToken',
+        **kwargs
+    )
+
+
+def get_parameters_by_path_iter(self, **kwargs):
+    """
+    This will continue to call get_parameters_by_path until there are no more pages left to retrieve.  It will yield each of
+    the Parameters as each page is retrieved rather than waiting for every page.
+
+    :param self: ssm client
+    :param kwargs: these are passed onto the get_parameters_by_path method call
+    :return: generator of ssm_client.get_parameters_by_path.response.Parameters
+    """
+    return slurp_iter(
+        'get_parameters_by_path',
+        self.get_parameters_by_path,
+        'Parameters',
+        'NextToken', 'NextToken',
+        **kwargs
+    )
+
+
+class ParametersByPathCache(object):
+    """
+    ParametersByPathCache holds the responses of get_parameters_by_path_single_page for up to ttl seconds.  Entries for
+    a path are dropped whenever a parameter under that path is put using put_parameter_and_wait or
+    put_parameters_and_wait on the same client.
+    """
+    def __init__(self, ttl=300):
+        super().__init__()
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, client, Path, **kwargs):
+        key = (Path, json.dumps(kwargs, sort_keys=True))
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and time.time() - entry[0] <= self.ttl:
+            return entry[1]
+        response = client.get_parameters_by_path_single_page(Path=Path, **kwargs)
+        with self._lock:
+            self._entries[key] = (time.time(), response)
+        return response
+
+    def invalidate(self, name=None):
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+                return
+            for key in list(self._entries.keys()):
+                if name.startswith(key[0].rstrip('/') + '/'):
+                    del self._entries[key]
+
+
+def get_parameters_by_path_cached(self, Path, **kwargs):
+    """
+    This will return the same response as get_parameters_by_path_single_page, reading it from the client's
+    parameters_by_path_cache when it was fetched within the cache's ttl.
+
+    :param self: ssm client
+    :param Path: the path to get the parameters for
+    :param kwargs: these are passed onto the get_parameters_by_path method call
+    :return: ssm_client.get_parameters_by_path.response
+    """
+    return self.parameters_by_path_cache.get(self, Path, **kwargs)
+
+
 def get_parameter_history_single_page(self, **kwargs):
     """
     This will continue to call get_parameter_history_single_page until there are no more pages left to retrieve.
@@ -57,25 +187,115 @@ def get_parameter_history_single_page(self, **kwargs):
     )
 
 
+def get_parameter_history_iter(self, **kwargs):
+    """
+    This will continue to call get_parameter_history until there are no more pages left to retrieve.  It will yield each of
+    the Parameters as each page is retrieved rather than waiting for every page.
+
+    :param self: ssm client
+    :param kwargs: these are passed onto the get_parameter_history method call
+    :return: generator of ssm_client.get_parameter_history.response.Parameters
+    """
+    return slurp_iter(
+        'get_parameter_history',
+        self.get_parameter_history,
+        'Parameters',
+        'NextToken', 'NextToken',
+        **kwargs
+    )
+
+
 class ParameterVersionNotFoundException(Exception):
     pass
 
 
-def get_parameter_version(self, Version, **kwargs):
-    paginator = self.get_paginator('get_parameter_history')
-    iterator = paginator.paginate(
-        **kwargs
-    )
-    for page in iterator:
-        for parameter in page.get("Parameters", []):
-            if parameter.get("Version") == Version:
-                return dict(Parameter=parameter)
+class ParameterVersionIndex(object):
+    """
+    ParameterVersionIndex holds every version of a parameter seen in its history, keyed by version number, so looking
+    up a version already seen does not call ssm again.  When asked for a version newer than any it has seen it only
+    fetches the history from the last page it read, rather than the whole history again.
+    """
+    def __init__(self):
+        super().__init__()
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self, client, Name, entry, kwargs):
+        next_token = entry.get('last_page_token')
+        while True:
+            request = dict(Name=Name, **kwargs)
+            if next_token is not None:
+                request['NextToken'] = next_token
+            try:
+                response = client.get_parameter_history(**request)
+            except client.exceptions.InvalidNextToken:
+                if next_token is None:
+                    raise
+                logger.info("Token for the history of {} has expired, reading it all again".format(Name))
+                next_token = None
+                continue
+            for parameter in response.get('Parameters', []):
+                entry['versions'][parameter.get('Version')] = parameter
+            if response.get('NextToken') is None:
+                entry['last_page_token'] = next_token
+                return
+            next_token = response.get('NextToken')
 
-    raise ParameterVersionNotFoundException(f"Could not find version: {Version} of {kwargs.get('Name')}")
+    def get(self, client, Name, Version, **kwargs):
+        key = (Name, json.dumps(kwargs, sort_keys=True))
+        with self._lock:
+            entry = self._entries.setdefault(key, dict(versions={}, last_page_token=None, lock=threading.Lock()))
+        with entry['lock']:
+            versions = entry['versions']
+            if Version not in versions and Version > max(versions.keys(), default=0):
+                self._refresh(client, Name, entry, kwargs)
+            parameter = versions.get(Version)
+        if parameter is None:
+            raise ParameterVersionNotFoundException(f"Could not find version: {Version} of {Name}")
+        return parameter
+
+
+# get_parameter_history arguments such as MaxResults and NextToken are not valid for get_parameter
+get_parameter_kwargs = ['WithDecryption']
+
+
+def get_parameter_version(self, Version, Name, ShouldUseSelector=True, **kwargs):
+    """
+    This will return the given version of the parameter.  It uses get_parameter with a Name:Version selector and when
+    that cannot be used, eg when get_parameter is not allowed, it falls back to the client's parameter_version_index
+    which reads the parameter history.  Only the kwargs get_parameter accepts are passed onto it.
+
+    The Parameter returned is in the structure the call used returns.  From the selector it is the get_parameter
+    structure, which includes Selector and ARN but not Labels, Description, LastModifiedUser, Tier, Policies, KeyId or
+    AllowedPattern.  Set ShouldUseSelector to False to always get the get_parameter_history structure, which has them.
+
+    :param self: ssm client
+    :param Version: the version of the parameter to get
+    :param Name: the name of the parameter
+    :param ShouldUseSelector: set to False to always use the parameter history
+    :param kwargs: these are passed onto the get_parameter or get_parameter_history method call
+    :return: dict with Parameter
+    """
+    if ShouldUseSelector:
+        selector_kwargs = {key: value for key, value in kwargs.items() if key in get_parameter_kwargs}
+        try:
+            return self.get_parameter(Name=f"{Name}:{Version}", **selector_kwargs)
+        except self.exceptions.ParameterVersionNotFound:
+            raise ParameterVersionNotFoundException(f"Could not find version: {Version} of {Name}")
+        except self.exceptions.ClientError as e:
+            logger.info("Could not use a selector to get version {} of {}: {}".format(Version, Name, e))
+    return dict(Parameter=self.parameter_version_index.get(self, Name, Version, **kwargs))
 
 
 def make_better(client):
+    client.parameters_by_path_cache = ParametersByPathCache()
+    client.parameter_version_index = ParameterVersionIndex()
     client.put_parameter_and_wait = types.MethodType(put_parameter_and_wait, client)
+    client.put_parameters_and_wait = types.MethodType(put_parameters_and_wait, client)
+    client.get_parameters_by_path_single_page = types.MethodType(get_parameters_by_path_single_page, client)
+    client.get_parameters_by_path_iter = types.MethodType(get_parameters_by_path_iter, client)
+    client.get_parameters_by_path_cached = types.MethodType(get_parameters_by_path_cached, client)
     client.get_parameter_history_single_page = types.MethodType(get_parameter_history_single_page, client)
+    client.get_parameter_history_iter = types.MethodType(get_parameter_history_iter, client)
     client.get_parameter_version = types.MethodType(get_parameter_version, client)
     return client
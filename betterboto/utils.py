@@ -1,31 +1,236 @@
+import collections
 import logging
+import random
+import threading
 import time
-import copy
 
 logger = logging.getLogger(__file__)
 
 
+def _prepare_slurp(name, kwargs):
+    # **kwargs is already a fresh dict owned by this call, and slurp only ever writes the pagination token key into
+    # it, so it is used as is rather than being copied
+    logging_prefix = kwargs.pop('logging_prefix', None) or ''
+    should_log = logger.isEnabledFor(logging.INFO)
+    if should_log:
+        logger.info("%s%s: %s", logging_prefix, name, kwargs)
+    return logging_prefix, should_log
+
+
 def slurp(
         name, func, response_to_concat,
         next_token_name_in_response='NextPageToken', next_token_name_in_request='PageToken',
         wait_between_pages=0,
         **kwargs
 ):
-    kwargs_to_use = copy.deepcopy(kwargs)
-    logging_prefix = ''
-    if kwargs_to_use.get('logging_prefix'):
-        logging_prefix = kwargs_to_use.get('logging_prefix')
-        del kwargs_to_use['logging_prefix']
-
-    logger.info("{}{}: {}".format(logging_prefix, name, kwargs_to_use))
+    logging_prefix, should_log = _prepare_slurp(name, kwargs)
     all_responses = []
     while True:
-        logger.info(f"{logging_prefix}{name} searching, {next_token_name_in_request}: {kwargs_to_use.get(next_token_name_in_request, 'FirstPage')}")
-        response = func(**kwargs_to_use)
+        if should_log:
+            logger.info(
+                "%s%s searching, %s: %s",
+                logging_prefix, name, next_token_name_in_request, kwargs.get(next_token_name_in_request, 'FirstPage')
+            )
+        response = func(**kwargs)
         all_responses += response.get(response_to_concat)
-        if response.get(next_token_name_in_response) is None:
+        next_token = response.get(next_token_name_in_response)
+        if next_token is None:
             response[response_to_concat] = all_responses
             return response
+        kwargs[next_token_name_in_request] = next_token
+        if wait_between_pages:
+            time.sleep(wait_between_pages)
+
+
+class SlurpIterator(object):
+    """
+    SlurpIterator is returned from slurp_iter.  Iterating over it yields each item of response_to_concat as soon as the
+    page containing it has arrived, and next_page returns the items a page at a time, which lets callers such as
+    AsyncClient hand off a whole page at once rather than each item.
+    """
+    def __init__(
+            self, name, func, response_to_concat, next_token_name_in_response, next_token_name_in_request,
+            wait_between_pages, kwargs,
+    ):
+        super().__init__()
+        self.name = name
+        self.func = func
+        self.response_to_concat = response_to_concat
+        self.next_token_name_in_response = next_token_name_in_response
+        self.next_token_name_in_request = next_token_name_in_request
+        self.wait_between_pages = wait_between_pages
+        self.kwargs = kwargs
+        self._logging_prefix = None
+        self._should_log = False
+        self._has_started = False
+        self._has_finished = False
+        self._items = collections.deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while len(self._items) == 0:
+            page = self.next_page()
+            if page is None:
+                raise StopIteration
+            self._items.extend(page)
+        return self._items.popleft()
+
+    def next_page(self):
+        """
+        Returns the items not yet iterated over from the current page or, when there are none, the items of the next
+        page.  Returns None once there are no more pages left.
+        """
+        if len(self._items) > 0:
+            page = list(self._items)
+            self._items.clear()
+            return page
+        if self._has_finished:
+            return None
+        if not self._has_started:
+            self._logging_prefix, self._should_log = _prepare_slurp(self.name, self.kwargs)
+            self._has_started = True
+        elif self.wait_between_pages:
+            time.sleep(self.wait_between_pages)
+        if self._should_log:
+            logger.info(
+                "%s%s searching, %s: %s",
+                self._logging_prefix, self.name, self.next_token_name_in_request,
+                self.kwargs.get(self.next_token_name_in_request, 'FirstPage'),
+            )
+        response = self.func(**self.kwargs)
+        if self.response_to_concat not in response:
+            raise Exception("{}{} response does not contain {}".format(
+                self._logging_prefix, self.name, self.response_to_concat
+            ))
+        next_token = response.get(self.next_token_name_in_response)
+        if next_token is None:
+            self._has_finished = True
         else:
-            kwargs_to_use[next_token_name_in_request] = response.get(next_token_name_in_response)
-        time.sleep(wait_between_pages)
+            self.kwargs[self.next_token_name_in_request] = next_token
+        return response.get(self.response_to_concat)
+
+
+def slurp_iter(
+        name, func, response_to_concat,
+        next_token_name_in_response='NextPageToken', next_token_name_in_request='PageToken',
+        wait_between_pages=0,
+        **kwargs
+):
+    """
+    This is the streaming version of slurp.  Rather than waiting for every page to be retrieved it will yield each item
+    of response_to_concat as soon as the page containing it has arrived, so only one page is held in memory at a time.
+    Nothing is called until the first item or page is asked for.
+
+    :return: SlurpIterator
+    """
+    return SlurpIterator(
+        name, func, response_to_concat, next_token_name_in_response, next_token_name_in_request,
+        wait_between_pages, kwargs,
+    )
+
+
+THROTTLING_ERROR_CODES = [
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'RequestThrottledException',
+    'TooManyRequestsException',
+    'ProvisionedThroughputExceededException',
+    'TransactionInProgressException',
+    'RequestLimitExceeded',
+    'SlowDown',
+    'PriorRequestNotComplete',
+]
+
+
+def is_throttling_error(exception):
+    """
+    Returns True when the given exception is a botocore ClientError caused by the request being throttled
+    """
+    response = getattr(exception, 'response', None)
+    if not isinstance(response, dict):
+        return False
+    return response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES
+
+
+def call_with_retries(func, *args, max_retries=5, base_delay=1, max_delay=30, **kwargs):
+    """
+    Calls func with the given args, retrying with exponential backoff and jitter each time it is throttled
+    """
+    attempt = 0
+    while True:
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if not is_throttling_error(e) or attempt >= max_retries:
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            logger.info("%s was throttled, retrying in %.2f seconds", getattr(func, '__name__', func), delay)
+            time.sleep(delay)
+            attempt += 1
+
+
+def backoff_delays(initial_delay=1, max_delay=15, factor=1.5):
+    """
+    Yields the delays to sleep for between polls, starting at initial_delay and growing by factor up to max_delay
+    """
+    delay = initial_delay
+    while True:
+        yield delay
+        delay = min(max_delay, delay * factor)
+
+
+class RateLimiter(object):
+    """
+    RateLimiter is a thread safe token bucket that limits calls to rate per second.  When a call made through it is
+    throttled the rate is halved, and each successful call then raises the rate back towards its initial value.
+    """
+    def __init__(self, rate, min_rate=0.5):
+        super().__init__()
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self._tokens = 1.0
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(max(self.rate, 1.0), self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def on_throttled(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def call(self, func, *args, max_retries=5, **kwargs):
+        """
+        Calls func with the given args once the rate allows, retrying with a lower rate each time it is throttled
+        """
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if not is_throttling_error(e) or attempt >= max_retries:
+                    raise
+                logger.info("{} was throttled, lowering rate".format(getattr(func, "__name__", func)))
+                self.on_throttled()
+                attempt += 1
+                continue
+            self.on_success()
+            return result
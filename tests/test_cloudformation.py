@@ -0,0 +1,192 @@
+import threading
+import time
+import types
+
+import pytest
+from botocore.exceptions import ClientError
+
+from betterboto import cloudformation
+
+
+class FakeS3(object):
+    exceptions = types.SimpleNamespace(ClientError=ClientError)
+
+    def __init__(self, objects=None, location_constraint='eu-west-1'):
+        self.objects = dict(objects or {})
+        self.location_constraint = location_constraint
+        self.heads = []
+        self.puts = []
+
+    def get_bucket_location(self, Bucket):
+        if self.location_constraint is ClientError:
+            raise ClientError({'Error': {'Code': 'AccessDenied'}}, 'GetBucketLocation')
+        return {'LocationConstraint': self.location_constraint}
+
+    def head_object(self, Bucket, Key):
+        self.heads.append(Key)
+        if (Bucket, Key) not in self.objects:
+            raise ClientError({'Error': {'Code': '404'}}, 'HeadObject')
+        return {}
+
+    def put_object(self, Bucket, Key, Body):
+        self.puts.append(Key)
+        self.objects[(Bucket, Key)] = Body
+        return {}
+
+
+big_template = 'Resources: {}\n' + '#' * 100
+
+
+def test_template_stager_uploads_when_the_template_is_not_in_the_bucket():
+    s3 = FakeS3()
+    stager = cloudformation.TemplateStager(s3, 'bucket', threshold=10)
+    staged = stager.stage(dict(StackName='stack', TemplateBody=big_template))
+
+    key = stager.get_key(big_template)
+    assert s3.puts == [key]
+    assert s3.objects[('bucket', key)] == str.encode(big_template)
+    assert staged == dict(StackName='stack', TemplateURL='https://bucket.s3.eu-west-1.amazonaws.com/' + key)
+
+
+def test_template_stager_does_not_upload_when_the_template_is_already_in_the_bucket():
+    stager = cloudformation.TemplateStager(FakeS3(), 'bucket', threshold=10)
+    key = stager.get_key(big_template)
+    s3 = FakeS3(objects={('bucket', key): str.encode(big_template)})
+    stager = cloudformation.TemplateStager(s3, 'bucket', threshold=10)
+
+    staged = stager.stage(dict(TemplateBody=big_template))
+
+    assert s3.heads == [key]
+    assert s3.puts == []
+    assert 'TemplateBody' not in staged
+
+
+def test_template_stager_passes_small_templates_through():
+    s3 = FakeS3()
+    stager = cloudformation.TemplateStager(s3, 'bucket')
+    kwargs = dict(StackName='stack', TemplateBody='Resources: {}')
+
+    assert stager.stage(kwargs) is kwargs
+    assert s3.heads == []
+    assert s3.puts == []
+
+
+def test_template_stager_uploads_once_for_repeated_calls():
+    s3 = FakeS3()
+    stager = cloudformation.TemplateStager(s3, 'bucket', threshold=10)
+
+    for _ in range(3):
+        stager.stage(dict(TemplateBody=big_template))
+
+    assert len(s3.heads) == 1
+    assert len(s3.puts) == 1
+
+
+def test_template_stager_uses_us_east_1_for_buckets_without_a_location_constraint():
+    stager = cloudformation.TemplateStager(FakeS3(location_constraint=None), 'bucket')
+
+    assert stager.get_url('key') == 'https://bucket.s3.us-east-1.amazonaws.com/key'
+
+
+def test_template_stager_fails_before_uploading_when_the_bucket_region_is_unknown():
+    s3 = FakeS3(location_constraint=ClientError)
+    stager = cloudformation.TemplateStager(s3, 'bucket', threshold=10)
+
+    with pytest.raises(Exception, match='region_name'):
+        stager.stage(dict(TemplateBody=big_template))
+    assert s3.puts == []
+
+
+def run_stacks(dependencies, failing=(), max_concurrency=1, on_failure='SKIP_DEPENDENTS'):
+    ran = []
+
+    def deploy(name):
+        ran.append(name)
+        if name in failing:
+            raise Exception('{} failed'.format(name))
+
+    result = cloudformation._run_in_dependency_order(
+        list(dependencies.keys()), dependencies, deploy, max_concurrency, on_failure,
+    )
+    return ran, {name: stack.get('Status') for name, stack in result.get('Stacks').items()}
+
+
+def test_run_in_dependency_order_runs_dependencies_first():
+    ran, statuses = run_stacks({'c': ['b'], 'b': ['a'], 'a': []})
+
+    assert ran == ['a', 'b', 'c']
+    assert statuses == {'a': 'SUCCEEDED', 'b': 'SUCCEEDED', 'c': 'SUCCEEDED'}
+
+
+def test_run_in_dependency_order_skips_dependents_of_failed_stacks():
+    ran, statuses = run_stacks({'a': [], 'b': ['a'], 'c': ['b'], 'd': []}, failing=['b'])
+
+    assert 'c' not in ran
+    assert statuses == {'a': 'SUCCEEDED', 'b': 'FAILED', 'c': 'SKIPPED', 'd': 'SUCCEEDED'}
+
+
+def test_run_in_dependency_order_does_not_start_queued_stacks_after_a_failure_when_stopping():
+    ran, statuses = run_stacks({'a': [], 'b': ['a'], 'd': ['a']}, failing=['b'], on_failure='STOP')
+
+    assert ran == ['a', 'b']
+    assert statuses == {'a': 'SUCCEEDED', 'b': 'FAILED', 'd': 'SKIPPED'}
+
+
+def test_run_in_dependency_order_runs_at_most_max_concurrency_at_once():
+    lock = threading.Lock()
+    running = []
+    most_running = []
+
+    def deploy(name):
+        with lock:
+            running.append(name)
+            most_running.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.remove(name)
+
+    names = ['s{}'.format(i) for i in range(10)]
+    result = cloudformation._run_in_dependency_order(names, {}, deploy, 3, 'SKIP_DEPENDENTS')
+
+    assert max(most_running) <= 3
+    assert all(stack.get('Status') == 'SUCCEEDED' for stack in result.get('Stacks').values())
+
+
+def test_run_in_dependency_order_rejects_cycles():
+    with pytest.raises(Exception, match='Circular dependency'):
+        run_stacks({'a': ['c'], 'b': ['a'], 'c': ['b']})
+
+
+def test_run_in_dependency_order_rejects_unknown_dependencies():
+    with pytest.raises(Exception, match='unknown stacks'):
+        run_stacks({'a': ['missing']})
+
+
+class StubStacksClient(object):
+    def __init__(self, stacks):
+        self.stacks = stacks
+        self.described = []
+
+    def describe_stacks_iter(self):
+        return iter(self.stacks)
+
+    def list_exports_iter(self):
+        return iter([])
+
+    def describe_stacks_single_page(self, StackName):
+        self.described.append(StackName)
+        return dict(Stacks=[])
+
+
+def test_ensure_deleted_many_does_not_select_nested_stacks():
+    client = StubStacksClient([
+        dict(StackName='app-root', StackId='root-id', Tags=[dict(Key='team', Value='a')]),
+        dict(StackName='app-root-nested', StackId='nested-id', ParentId='root-id', RootId='root-id',
+             Tags=[dict(Key='team', Value='a')]),
+        dict(StackName='other', StackId='other-id', Tags=[dict(Key='team', Value='a')]),
+    ])
+
+    result = cloudformation.ensure_deleted_many(client, StackNamePrefix='app-', Tags={'team': 'a'})
+
+    assert list(result.get('Stacks').keys()) == ['app-root']
+    assert client.described == ['app-root']
@@ -0,0 +1,35 @@
+from botocore.exceptions import ClientError
+
+from betterboto import codebuild
+
+
+class StubCodeBuild(object):
+    def __init__(self, failing_projects=()):
+        self.failing_projects = failing_projects
+        self.started = []
+
+    def start_build(self, projectName):
+        if projectName in self.failing_projects:
+            raise ClientError(
+                dict(Error=dict(Code='AccountLimitExceededException', Message='limit reached')), 'StartBuild'
+            )
+        self.started.append(projectName)
+        return dict(build=dict(id='{}:1'.format(projectName), buildStatus='IN_PROGRESS'))
+
+    def batch_get_builds(self, ids):
+        return dict(builds=[dict(id=build_id, buildStatus='SUCCEEDED') for build_id in ids])
+
+
+def test_start_builds_and_wait_yields_start_failures_and_carries_on():
+    client = StubCodeBuild(failing_projects=['b'])
+
+    results = list(codebuild.start_builds_and_wait(
+        client, [dict(projectName='a'), dict(projectName='b'), dict(projectName='c')], MinDelay=0, MaxDelay=0,
+    ))
+
+    assert client.started == ['a', 'c']
+    failed = [result for result in results if result.exception is not None]
+    assert [result.build_args for result in failed] == [dict(projectName='b')]
+    assert failed[0].build is None
+    succeeded = sorted(result.build.get('id') for result in results if result.exception is None)
+    assert succeeded == ['a:1', 'c:1']
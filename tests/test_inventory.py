@@ -0,0 +1,81 @@
+import datetime
+import time
+from unittest import mock
+
+from betterboto import cloudformation
+from betterboto import inventory
+
+
+class StubCloudFormation(object):
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def list_stacks(self, **kwargs):
+        self.calls.append(kwargs)
+        return self.pages[kwargs.get('NextToken', 0)]
+
+
+class StubContextManager(object):
+    def __init__(self, client):
+        self.client = client
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def __enter__(self):
+        return self.client
+
+    def __exit__(self, *args, **kwargs):
+        pass
+
+
+def test_list_stack_inventory_reads_stack_summaries_from_list_stacks():
+    created_at = datetime.datetime(2020, 1, 1)
+    client = cloudformation.make_better(StubCloudFormation({
+        0: {
+            'StackSummaries': [
+                {'StackName': 'a', 'StackId': 'id-a', 'StackStatus': 'CREATE_COMPLETE', 'CreationTime': created_at},
+            ],
+            'NextToken': 1,
+        },
+        1: {
+            'StackSummaries': [
+                {'StackName': 'b', 'StackId': 'id-b', 'StackStatus': 'UPDATE_COMPLETE', 'CreationTime': created_at,
+                 'LastUpdatedTime': created_at.replace(year=2021)},
+            ],
+        },
+    }))
+
+    with mock.patch.object(inventory, 'ClientContextManager', StubContextManager(client)):
+        records = list(inventory.list_stack_inventory([('0123456789010', 'eu-west-1')]))
+
+    assert [record.to_dict() for record in records] == [
+        {
+            'account_id': '0123456789010', 'region_name': 'eu-west-1', 'stack_name': 'a', 'stack_id': 'id-a',
+            'stack_status': 'CREATE_COMPLETE', 'last_updated_time': '2020-01-01T00:00:00', 'tags': None,
+            'outputs': None,
+        },
+        {
+            'account_id': '0123456789010', 'region_name': 'eu-west-1', 'stack_name': 'b', 'stack_id': 'id-b',
+            'stack_status': 'UPDATE_COMPLETE', 'last_updated_time': '2021-01-01T00:00:00', 'tags': None,
+            'outputs': None,
+        },
+    ]
+    assert client.calls[0].get('StackStatusFilter') == inventory.ACTIVE_STACK_STATUSES
+
+
+def test_list_stack_inventory_does_not_list_queued_targets_once_the_consumer_stops():
+    client = cloudformation.make_better(StubCloudFormation({
+        0: {'StackSummaries': [{'StackName': 'a', 'StackId': 'id-a', 'StackStatus': 'CREATE_COMPLETE'}]},
+    }))
+    targets = [('{:012d}'.format(i), 'eu-west-1') for i in range(50)]
+
+    with mock.patch.object(inventory, 'ClientContextManager', StubContextManager(client)):
+        records = inventory.list_stack_inventory(targets, max_workers=1)
+        next(records)
+        records.close()
+        # give a target that was already running time to finish
+        time.sleep(0.2)
+
+    assert len(client.calls) <= 2
@@ -0,0 +1,29 @@
+import types
+
+from botocore.exceptions import ClientError
+
+from betterboto import ssm
+
+
+class ParameterVersionNotFound(ClientError):
+    pass
+
+
+class StubSSM(object):
+    exceptions = types.SimpleNamespace(ClientError=ClientError, ParameterVersionNotFound=ParameterVersionNotFound)
+
+    def __init__(self):
+        self.get_parameter_calls = []
+
+    def get_parameter(self, Name, WithDecryption=False):
+        self.get_parameter_calls.append(dict(Name=Name, WithDecryption=WithDecryption))
+        return dict(Parameter=dict(Name=Name.split(':')[0], Version=int(Name.split(':')[1]), Selector=':2'))
+
+
+def test_get_parameter_version_passes_only_get_parameter_kwargs_to_the_selector():
+    client = StubSSM()
+
+    response = ssm.get_parameter_version(client, 2, '/app/setting', WithDecryption=True, MaxResults=50)
+
+    assert client.get_parameter_calls == [dict(Name='/app/setting:2', WithDecryption=True)]
+    assert response.get('Parameter').get('Version') == 2